@@ -14,7 +14,7 @@ __author__ = "Cleanup Toolkit Contributors"
 __email__ = "contact@cleanup-toolkit.dev"
 
 from cleanup_toolkit.core import CleanupEngine, CleanupConfig
-from cleanup_toolkit.analyzers import CodeAnalyzer, PatternMatcher
+from cleanup_toolkit.analyzers import CodeAnalyzer, Match, PatternMatcher
 from cleanup_toolkit.commands import CleanupCommand
 
 __all__ = [
@@ -22,6 +22,7 @@ __all__ = [
     "CleanupConfig",
     "CodeAnalyzer",
     "PatternMatcher",
+    "Match",
     "CleanupCommand",
     "__version__",
 ]
\ No newline at end of file
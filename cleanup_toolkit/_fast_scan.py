@@ -0,0 +1,182 @@
+"""
+Optional accelerated scanning for literal patterns.
+
+Many cleanup patterns (``fmt\\.Print``, ``pdb\\.set_trace``) are plain
+literals once their escapes are removed. Those can be located without the
+regex engine by one of two optional backends:
+
+- ``pyahocorasick``: one automaton finds every needle in a single pass.
+- ``numba``: a JIT-compiled byte scanner with a first-byte bitmask table.
+
+Both are imported lazily on first use. When neither is installed,
+``compile_literals()`` returns None and callers keep using regex.
+"""
+
+import bisect
+from typing import List, Optional, Tuple
+
+# A first-byte bitmask limits a single Numba scan to 64 needles
+MAX_NEEDLES = 64
+
+_REGEX_META = set(".^$*+?{}[]|()")
+
+_ahocorasick = None
+_kernel = None
+_np = None
+_checked = False
+
+
+def literal_of(pattern: str) -> Optional[str]:
+    """Return the ASCII literal a regex pattern matches, or None if it is not one."""
+    literal = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            if char.isalnum():
+                return None
+            literal.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _REGEX_META:
+            return None
+        else:
+            literal.append(char)
+
+    if escaped or not literal:
+        return None
+    text = "".join(literal)
+    return text if text.isascii() else None
+
+
+def _load_backends():
+    """Import the optional backends once."""
+    global _ahocorasick, _kernel, _np, _checked
+    if _checked:
+        return
+    _checked = True
+    try:
+        import ahocorasick
+        _ahocorasick = ahocorasick
+    except ImportError:
+        pass
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return
+    _np = np
+    _kernel = njit(cache=True)(_find_literals)
+
+
+def available() -> bool:
+    """Check whether any accelerated literal backend is installed."""
+    _load_backends()
+    return _ahocorasick is not None or _kernel is not None
+
+
+def compile_literals(needles: List[str]) -> Optional["LiteralScanner"]:
+    """Build a scanner for needles with the best available backend."""
+    _load_backends()
+    if _ahocorasick is not None:
+        return AhoCorasickScanner(needles)
+    if _kernel is not None:
+        return NumbaScanner(needles)
+    return None
+
+
+class LiteralScanner:
+    """Find ASCII case-insensitive literal needles in text."""
+
+    def scan(self, content: str, newlines: List[int]) -> List[Tuple[int, int]]:
+        """Return (zero-based line index, needle index) for each hit in content."""
+        raise NotImplementedError
+
+
+class AhoCorasickScanner(LiteralScanner):
+    """Literal scanner backed by a pyahocorasick automaton."""
+
+    def __init__(self, needles: List[str]):
+        self.automaton = _ahocorasick.Automaton()
+        for k, needle in enumerate(needles):
+            lowered = needle.lower()
+            self.automaton.add_word(lowered, (k, len(lowered)))
+        self.automaton.make_automaton()
+
+    def scan(self, content: str, newlines: List[int]) -> List[Tuple[int, int]]:
+        lowered = content.lower()
+        if len(lowered) != len(content):
+            # Some characters lower-case to several, so offsets shifted
+            newlines = [i for i, c in enumerate(lowered) if c == "\n"]
+        hits = []
+        for end, (k, length) in self.automaton.iter(lowered):
+            hits.append((bisect.bisect_right(newlines, end - length + 1), k))
+        return hits
+
+
+class NumbaScanner(LiteralScanner):
+    """Literal scanner backed by the Numba byte kernel."""
+
+    def __init__(self, needles: List[str]):
+        np = _np
+        encoded = [needle.lower().encode("ascii") for needle in needles[:MAX_NEEDLES]]
+        self.needle_buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        self.needle_lens = np.array([len(e) for e in encoded], dtype=np.int64)
+        self.needle_starts = np.zeros(len(encoded), dtype=np.int64)
+        self.needle_starts[1:] = np.cumsum(self.needle_lens)[:-1]
+        self.first_mask = np.zeros(256, dtype=np.int64)
+        for k, e in enumerate(encoded):
+            self.first_mask[e[0]] |= np.int64(1) << k
+
+    def scan(self, content: str, newlines: List[int]) -> List[Tuple[int, int]]:
+        np = _np
+        buf = np.frombuffer(content.encode("utf-8", "surrogatepass"), dtype=np.uint8)
+
+        capacity = 1024
+        while True:
+            out_offsets = np.empty(capacity, dtype=np.int64)
+            out_needles = np.empty(capacity, dtype=np.int64)
+            count = _kernel(buf, self.needle_buf, self.needle_starts, self.needle_lens,
+                            self.first_mask, out_offsets, out_needles)
+            if count <= capacity:
+                break
+            capacity = count
+
+        # Offsets are in bytes, so map lines with the buffer's own newlines
+        byte_newlines = np.flatnonzero(buf == 10)
+        lines = np.searchsorted(byte_newlines, out_offsets[:count], side="right")
+        return list(zip(lines.tolist(), out_needles[:count].tolist()))
+
+
+def _find_literals(buf, needles, needle_starts, needle_lens, first_mask, out_offsets, out_needles):
+    """Record (offset, needle) for every ASCII case-insensitive needle hit in buf."""
+    n = buf.shape[0]
+    count = 0
+    for i in range(n):
+        c = buf[i]
+        if 65 <= c <= 90:
+            c += 32
+        mask = first_mask[c]
+        if mask == 0:
+            continue
+        for k in range(needle_lens.shape[0]):
+            if not (mask >> k) & 1:
+                continue
+            length = needle_lens[k]
+            if i + length > n:
+                continue
+            start = needle_starts[k]
+            matched = True
+            for j in range(1, length):
+                b = buf[i + j]
+                if 65 <= b <= 90:
+                    b += 32
+                if b != needles[start + j]:
+                    matched = False
+                    break
+            if matched:
+                if count < out_offsets.shape[0]:
+                    out_offsets[count] = i
+                    out_needles[count] = k
+                count += 1
+    return count
@@ -3,109 +3,321 @@ Code analysis utilities for the cleanup toolkit.
 """
 
 import ast
+import bisect
+import copy
+import hashlib
+import os
+import pickle
 import re
+import sqlite3
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from cleanup_toolkit import _fast_scan
+from cleanup_toolkit.core import (
+    LANGUAGE_EXTENSIONS,
+    Content,
+    detect_language,
+    file_extension,
+    line_text,
+    newline_offsets,
+    open_for_scan,
+    pattern_for,
+)
+
+_BLANK_LINE = re.compile(r"^[ \t\r\f\v]*$", re.MULTILINE)
+_COMMENT_RE = {
+    "python": re.compile(r"^[ \t]*#", re.MULTILINE),
+    "javascript": re.compile(r"^[ \t]*(?://|/\*|\*)", re.MULTILINE),
+    "go": re.compile(r"^[ \t]*//", re.MULTILINE),
+    "java": re.compile(r"^[ \t]*(?://|/\*|\*)", re.MULTILINE),
+}
+# The single source of debug/TODO patterns; PatternMatcher instances copy it.
+# Scans run over whole buffers, so whitespace is [ \t] to stay within a line
+DEFAULT_PATTERNS = {
+    "debug": {
+        "python": [
+            r"print[ \t]*\(",
+            r"breakpoint[ \t]*\(\)",
+            r"import[ \t]+pdb",
+            r"pdb\.set_trace",
+            r"import[ \t]+ipdb",
+            r"ipdb\.set_trace",
+        ],
+        "javascript": [
+            r"console\.(log|debug|info|warn|error)",
+            r"debugger[ \t]*;",
+            r"alert[ \t]*\(",
+        ],
+        "go": [
+            r"fmt\.Print",
+            r"log\.Print",
+            r"println\(",
+        ],
+    },
+    # One alternation covers #, // and /* comments in a single scan; the
+    # comment lead-in keeps identifiers such as `note: str` from matching
+    "todo": [
+        r"(?:#|//|/\*)[ \t]*(?:TODO|FIXME|XXX|HACK|NOTE):",
+    ],
+}
+
+# Cleanup patterns are ASCII; skipping Unicode case folding keeps scans cheap
+_PATTERN_FLAGS = re.IGNORECASE | re.ASCII
+
+_HASH_CHUNK_SIZE = 65536
+# Bump when the shape of analyze() results changes to invalidate old caches
+_CACHE_SCHEMA_VERSION = 2
+
+
+def _file_digest(file_path: Path) -> bytes:
+    """Hash a file's contents in fixed-size chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+@dataclass
+class Match:
+    """A single issue found in a file; line is None for file-level issues."""
+    
+    __slots__ = ("line", "content", "pattern", "type")
+    
+    line: Optional[int]
+    content: str
+    pattern: str
+    type: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the match as a plain dict for serialization."""
+        return {
+            "line": self.line,
+            "content": self.content,
+            "pattern": self.pattern,
+            "type": self.type,
+        }
+
+
+class _PythonVisitor(ast.NodeVisitor):
+    """Collect definition counts, imported names and used names in one pass."""
+    
+    def __init__(self):
+        self.classes = 0
+        self.functions = 0
+        self.imports = 0
+        self.imported_names: Set[str] = set()
+        self.used_names: Set[str] = set()
+    
+    def visit_Name(self, node: ast.Name):
+        self.used_names.add(node.id)
+    
+    def visit_Attribute(self, node: ast.Attribute):
+        # Resolve a.b.c straight to its root instead of dispatching per link
+        root = node.value
+        while isinstance(root, ast.Attribute):
+            root = root.value
+        if isinstance(root, ast.Name):
+            self.used_names.add(root.id)
+        else:
+            self.visit(root)
+    
+    def visit_Import(self, node: ast.Import):
+        self.imports += 1
+        for alias in node.names:
+            self.imported_names.add(alias.asname or alias.name.split('.')[0])
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.imports += 1
+        for alias in node.names:
+            if alias.name != '*':
+                self.imported_names.add(alias.asname or alias.name)
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions += 1
+        self.generic_visit(node)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes += 1
+        self.generic_visit(node)
 
 
 class PatternMatcher:
     """Pattern matching for code cleanup."""
     
-    def __init__(self):
-        """Initialize the pattern matcher."""
-        self.patterns = {
-            "debug": {
-                "python": [
-                    r"print\s*\(",
-                    r"breakpoint\s*\(\)",
-                    r"import\s+pdb",
-                    r"pdb\.set_trace",
-                    r"import\s+ipdb",
-                    r"ipdb\.set_trace",
-                ],
-                "javascript": [
-                    r"console\.(log|debug|info|warn|error)",
-                    r"debugger\s*;",
-                    r"alert\s*\(",
-                ],
-                "go": [
-                    r"fmt\.Print",
-                    r"log\.Print",
-                    r"println\(",
-                ],
-            },
-            "todo": [
-                r"#\s*(TODO|FIXME|XXX|HACK|NOTE):",
-                r"//\s*(TODO|FIXME|XXX|HACK|NOTE):",
-                r"/\*\s*(TODO|FIXME|XXX|HACK|NOTE):",
-            ],
-        }
+    def __init__(self, debug_patterns: Optional[Dict[str, List[str]]] = None):
+        """Initialize the pattern matcher, replacing the default debug patterns if given."""
+        self.patterns = copy.deepcopy(DEFAULT_PATTERNS)
+        if debug_patterns is not None:
+            self.patterns["debug"] = copy.deepcopy(debug_patterns)
+        self.combined = {}
+        self._literal_splits = {}
+        self._scanners = {}
+        for pattern_type, patterns in self.patterns.items():
+            if isinstance(patterns, dict):
+                for language in patterns:
+                    self._build_combined(pattern_type, language)
+            else:
+                self._build_combined(pattern_type)
     
-    def find_patterns(self, content: str, pattern_type: str, language: str = None) -> List[Dict[str, Any]]:
-        """Find patterns in code content."""
+    def _build_combined(self, pattern_type: str, language: str = None):
+        """Fuse the patterns for a (type, language) pair into one alternation."""
+        patterns = self.patterns[pattern_type]
+        if language:
+            patterns = patterns[language]
+        regex = "|".join(f"(?P<p{i}>{p})" for i, p in enumerate(patterns))
+        self.combined[(pattern_type, language)] = (
+            re.compile(regex, _PATTERN_FLAGS),
+            list(patterns),
+            [re.compile(p, _PATTERN_FLAGS) for p in patterns],
+        )
+        
+        # Literal patterns can be handed to an optional accelerated scanner
+        # (Aho-Corasick or Numba), leaving only real regexes for the regex engine
+        literals = []
+        regex_parts = []
+        regex_indices = []
+        for i, p in enumerate(patterns):
+            literal = _fast_scan.literal_of(p)
+            if literal is not None and len(literals) < _fast_scan.MAX_NEEDLES:
+                literals.append((literal, i))
+            else:
+                regex_parts.append(f"(?P<p{i}>{p})")
+                regex_indices.append(i)
+        self._literal_splits[(pattern_type, language)] = (
+            re.compile("|".join(regex_parts), _PATTERN_FLAGS) if regex_parts else None,
+            literals,
+            regex_indices,
+        ) if literals else None
+        self._scanners.pop((pattern_type, language), None)
+    
+    def __getstate__(self):
+        """Drop compiled literal scanners when pickling; they are rebuilt lazily."""
+        state = self.__dict__.copy()
+        state["_scanners"] = {}
+        return state
+    
+    def find_patterns(self,
+                      content: Content,
+                      pattern_type: str,
+                      language: str = None,
+                      newlines: Optional[List[int]] = None) -> List["Match"]:
+        """Find patterns in text or bytes content, reusing newline offsets if given."""
         matches = []
-        lines = content.splitlines()
         
         if pattern_type == "debug" and language:
-            patterns = self.patterns["debug"].get(language, [])
+            key = ("debug", language)
         elif pattern_type == "todo":
-            patterns = self.patterns["todo"]
+            key = ("todo", None)
         else:
-            patterns = []
-        
-        for pattern_str in patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
-            for i, line in enumerate(lines, 1):
-                if pattern.search(line):
-                    matches.append({
-                        "line": i,
-                        "content": line.strip(),
-                        "pattern": pattern_str,
-                        "type": pattern_type,
-                    })
+            key = None
+        
+        if key not in self.combined:
+            return matches
+        
+        combined, pattern_strs, compiled = self.combined[key]
+        regex_indices = range(len(pattern_strs))
+        if newlines is None:
+            newlines = newline_offsets(content)
+        hits = []
+        
+        # The literal scanners work on text, so bytes and mmaps use regex only
+        split = None
+        if isinstance(content, str) and _fast_scan.available():
+            split = self._literal_splits[key]
+        if split:
+            combined, literals, regex_indices = split
+            scanner = self._scanners.get(key)
+            if scanner is None:
+                scanner = _fast_scan.compile_literals([literal for literal, _ in literals])
+                self._scanners[key] = scanner
+            for index, k in scanner.scan(content, newlines):
+                hits.append((index, literals[k][1]))
+        
+        if combined is not None:
+            # The alternation consumes what it matches, hiding other patterns that
+            # overlap it, so it only flags lines; each pattern is then searched
+            # for on its own in every flagged line
+            flagged = set()
+            for match in pattern_for(combined, content).finditer(content):
+                first = bisect.bisect_right(newlines, match.start())
+                last = bisect.bisect_right(newlines, max(match.start(), match.end() - 1))
+                flagged.update(range(first, last + 1))
+            for index in sorted(flagged):
+                text = line_text(content, newlines, index)
+                for i in regex_indices:
+                    if compiled[i].search(text):
+                        hits.append((index, i))
+        
+        # Line then pattern order, so every scan path reports hits identically
+        hits.sort()
+        
+        seen = set()
+        for hit in hits:
+            # Report each pattern at most once per line
+            if hit in seen:
+                continue
+            seen.add(hit)
+            index, pattern_index = hit
+            matches.append(Match(
+                index + 1,
+                line_text(content, newlines, index).strip(),
+                pattern_strs[pattern_index],
+                pattern_type,
+            ))
         
         return matches
     
     def add_custom_pattern(self, pattern_type: str, pattern: str, language: str = None):
         """Add a custom pattern for matching."""
-        if pattern_type not in self.patterns:
-            self.patterns[pattern_type] = {}
+        re.compile(pattern, _PATTERN_FLAGS)
         
         if language:
-            if language not in self.patterns[pattern_type]:
-                self.patterns[pattern_type][language] = []
-            self.patterns[pattern_type][language].append(pattern)
+            if pattern_type not in self.patterns:
+                self.patterns[pattern_type] = {}
+            self.patterns[pattern_type].setdefault(language, []).append(pattern)
         else:
             if pattern_type not in self.patterns:
                 self.patterns[pattern_type] = []
             self.patterns[pattern_type].append(pattern)
+        
+        self._build_combined(pattern_type, language)
 
 
 class CodeAnalyzer:
     """Analyze code for various quality issues."""
     
-    def __init__(self):
-        """Initialize the code analyzer."""
-        self.pattern_matcher = PatternMatcher()
-        self.supported_languages = {
-            ".py": "python",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".ts": "javascript",
-            ".tsx": "javascript",
-            ".go": "go",
-            ".java": "java",
-            ".rb": "ruby",
-            ".php": "php",
-        }
+    def __init__(self, cache_path: Optional[str] = None,
+                 pattern_matcher: Optional[PatternMatcher] = None):
+        """Initialize the code analyzer, optionally caching results in cache_path."""
+        self.pattern_matcher = pattern_matcher or PatternMatcher()
+        self.cache_path = cache_path
+        self._cache_db = None
+        self.supported_languages = LANGUAGE_EXTENSIONS
     
-    def analyze(self, file_path: str) -> Dict[str, Any]:
-        """Analyze a code file for issues."""
-        path = Path(file_path)
-        if not path.exists():
+    def analyze(self, file_path: str, content: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze a code file for issues, using already-read content if given."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return {"error": "File not found"}
         
-        language = self._detect_language(file_path)
+        cache_key = self._cache_key(file_path, st) if self.cache_path else None
+        if cache_key:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                # The key uses the absolute path; report the path as this caller spelled it
+                cached["file"] = file_path
+                return cached
+        
+        language = detect_language(file_path)
         results = {
             "file": file_path,
             "language": language,
@@ -114,130 +326,180 @@ class CodeAnalyzer:
         }
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Find debug statements
-            debug_matches = self.pattern_matcher.find_patterns(content, "debug", language)
-            results["issues"].extend(debug_matches)
-            
-            # Find TODOs
-            todo_matches = self.pattern_matcher.find_patterns(content, "todo")
-            results["issues"].extend(todo_matches)
-            
-            # Calculate metrics
-            lines = content.splitlines()
-            results["metrics"] = {
-                "total_lines": len(lines),
-                "blank_lines": sum(1 for line in lines if not line.strip()),
-                "comment_lines": self._count_comment_lines(lines, language),
-                "debug_statements": len(debug_matches),
-                "todos": len(todo_matches),
-            }
-            
-            # Language-specific analysis
-            if language == "python":
-                results["python_analysis"] = self._analyze_python(content)
+            source = open_for_scan(file_path) if content is None else nullcontext(content)
+            with source as content:
+                newlines = newline_offsets(content)
+                
+                # Find debug statements
+                debug_matches = self.pattern_matcher.find_patterns(
+                    content, "debug", language, newlines=newlines
+                )
+                results["issues"].extend(debug_matches)
+                
+                # Find TODOs
+                todo_matches = self.pattern_matcher.find_patterns(
+                    content, "todo", newlines=newlines
+                )
+                results["issues"].extend(todo_matches)
+                
+                # Calculate metrics
+                # A trailing newline (or empty content) yields one spurious empty match
+                trailing = 1 if not len(content) or content[-1:] in ("\n", b"\n") else 0
+                blank_lines = pattern_for(_BLANK_LINE, content).findall(content)
+                results["metrics"] = {
+                    "total_lines": len(newlines) + 1 - trailing,
+                    "blank_lines": len(blank_lines) - trailing,
+                    "comment_lines": self._count_comment_lines(content, language),
+                    "debug_statements": len(debug_matches),
+                    "todos": len(todo_matches),
+                }
+                
+                # Language-specific analysis
+                if language == "python":
+                    try:
+                        tree = ast.parse(content if isinstance(content, str) else content[:])
+                    except (SyntaxError, ValueError):
+                        results["python_analysis"] = {}
+                    else:
+                        results["python_analysis"] = self._analyze_python(tree)
             
         except Exception as e:
             results["error"] = str(e)
         
+        if cache_key and "error" not in results:
+            self._cache_put(cache_key, results)
+        
         return results
     
     def find_duplicates(self, directory: str) -> List[Dict[str, Any]]:
         """Find duplicate code blocks in a directory."""
         duplicates = []
-        file_hashes = {}
         
+        # Only files of identical size can be duplicates, so bucket by size
+        # first and hash just the buckets with more than one member
+        size_groups: Dict[int, List[Path]] = defaultdict(list)
         for file_path in Path(directory).rglob("*"):
             if file_path.is_file() and self._is_code_file(file_path):
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Simple hash-based duplicate detection
-                    content_hash = hash(content)
-                    if content_hash in file_hashes:
-                        duplicates.append({
-                            "file1": str(file_hashes[content_hash]),
-                            "file2": str(file_path),
-                            "type": "exact_duplicate",
-                        })
-                    else:
-                        file_hashes[content_hash] = file_path
-                
-                except Exception:
+                    size_groups[file_path.stat().st_size].append(file_path)
+                except OSError:
                     pass
         
+        for size, paths in size_groups.items():
+            if len(paths) < 2:
+                continue
+            
+            file_hashes = {}
+            for file_path in paths:
+                try:
+                    content_hash = _file_digest(file_path) if size else b""
+                except Exception:
+                    continue
+                
+                if content_hash in file_hashes:
+                    duplicates.append({
+                        "file1": str(file_hashes[content_hash]),
+                        "file2": str(file_path),
+                        "type": "exact_duplicate",
+                    })
+                else:
+                    file_hashes[content_hash] = file_path
+        
         return duplicates
     
-    def find_unused_imports(self, file_path: str) -> List[str]:
-        """Find unused imports in a Python file."""
+    def find_unused_imports(self, file_path: str, tree: Optional[ast.AST] = None) -> List[str]:
+        """Find unused imports in a Python file, reusing a parsed tree if given."""
         if not file_path.endswith('.py'):
             return []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
-            imported_names = set()
-            used_names = set()
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imported_names.add(alias.asname or alias.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom):
-                    for alias in node.names:
-                        imported_names.add(alias.asname or alias.name)
-                elif isinstance(node, ast.Name):
-                    used_names.add(node.id)
-            
-            unused = imported_names - used_names
-            return list(unused)
+            if tree is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    tree = ast.parse(f.read())
+            return self._analyze_python(tree)["unused_imports"]
         
         except Exception:
             return []
     
-    def _detect_language(self, file_path: str) -> str:
-        """Detect the programming language of a file."""
-        ext = Path(file_path).suffix.lower()
-        return self.supported_languages.get(ext, "unknown")
+    def _cache_key(self, file_path: str, st: os.stat_result) -> Tuple:
+        """Build the cache key for a file from its stat and the active patterns."""
+        patterns = repr(sorted(self.pattern_matcher.patterns.items())).encode()
+        cfg_hash = hashlib.blake2b(
+            patterns + _CACHE_SCHEMA_VERSION.to_bytes(2, "big"), digest_size=16
+        ).digest()
+        return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size, cfg_hash)
+    
+    def _cache(self) -> Optional[sqlite3.Connection]:
+        """Open the result cache on first use; caching is disabled if that fails."""
+        if self._cache_db is None and self.cache_path:
+            try:
+                Path(self.cache_path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self.cache_path, timeout=30, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, "
+                    "cfg_hash BLOB, result BLOB)"
+                )
+                self._cache_db = db
+            except sqlite3.Error:
+                self.cache_path = None
+        return self._cache_db
+    
+    def _cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, if the file is unchanged."""
+        db = self._cache()
+        if db is None:
+            return None
+        path, mtime, size, cfg_hash = key
+        try:
+            row = db.execute(
+                "SELECT mtime, size, cfg_hash, result FROM results WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[0] == mtime and row[1] == size and row[2] == cfg_hash:
+                return pickle.loads(row[3])
+        except (sqlite3.Error, pickle.PickleError, EOFError):
+            pass
+        return None
+    
+    def _cache_put(self, key: Tuple, results: Dict[str, Any]):
+        """Store a result in the cache."""
+        db = self._cache()
+        if db is None:
+            return
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (*key, pickle.dumps(results, pickle.HIGHEST_PROTOCOL)),
+            )
+        except sqlite3.Error:
+            pass
+    
+    def __getstate__(self):
+        """Drop the open cache connection when pickling for worker processes."""
+        state = self.__dict__.copy()
+        state["_cache_db"] = None
+        return state
     
     def _is_code_file(self, file_path: Path) -> bool:
         """Check if a file is a code file."""
-        return file_path.suffix.lower() in self.supported_languages
+        return file_extension(str(file_path)) in self.supported_languages
     
-    def _count_comment_lines(self, lines: List[str], language: str) -> int:
+    def _count_comment_lines(self, content: Content, language: str) -> int:
         """Count comment lines in code."""
-        count = 0
-        comment_patterns = {
-            "python": r"^\s*#",
-            "javascript": r"^\s*(//|/\*|\*)",
-            "go": r"^\s*//",
-            "java": r"^\s*(//|/\*|\*)",
-        }
-        
-        pattern_str = comment_patterns.get(language)
-        if not pattern_str:
+        pattern = _COMMENT_RE.get(language)
+        if pattern is None:
             return 0
-        
-        pattern = re.compile(pattern_str)
-        for line in lines:
-            if pattern.match(line):
-                count += 1
-        
-        return count
+        return len(pattern_for(pattern, content).findall(content))
     
-    def _analyze_python(self, content: str) -> Dict[str, Any]:
-        """Perform Python-specific analysis."""
-        try:
-            tree = ast.parse(content)
-            return {
-                "classes": len([n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)]),
-                "functions": len([n for n in ast.walk(tree) if isinstance(n, ast.FunctionDef)]),
-                "imports": len([n for n in ast.walk(tree) if isinstance(n, (ast.Import, ast.ImportFrom))]),
-            }
-        except Exception:
-            return {}
\ No newline at end of file
+    def _analyze_python(self, tree: ast.AST) -> Dict[str, Any]:
+        """Perform Python-specific analysis on a parsed module in one visit."""
+        visitor = _PythonVisitor()
+        visitor.visit(tree)
+        return {
+            "classes": visitor.classes,
+            "functions": visitor.functions,
+            "imports": visitor.imports,
+            "unused_imports": sorted(visitor.imported_names - visitor.used_names),
+        }
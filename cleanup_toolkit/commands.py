@@ -4,11 +4,25 @@ Command interface for the cleanup toolkit.
 
 import os
 import subprocess
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 
-from cleanup_toolkit.core import CleanupEngine, CleanupConfig
-from cleanup_toolkit.analyzers import CodeAnalyzer
+from cleanup_toolkit.core import (
+    CleanupEngine,
+    CleanupConfig,
+    PARALLEL_CHUNKSIZE,
+    detect_language,
+    read_text_for_scan,
+    walk_files,
+)
+from cleanup_toolkit.analyzers import CodeAnalyzer, Match, PatternMatcher
+
+# Reader threads and how many files may be read ahead of the scanner
+PREFETCH_WORKERS = 8
+PREFETCH_WINDOW = 32
 
 
 class CleanupCommand:
@@ -17,8 +31,9 @@ class CleanupCommand:
     def __init__(self, config: Optional[CleanupConfig] = None):
         """Initialize the cleanup command."""
         self.config = config or CleanupConfig()
-        self.engine = CleanupEngine(self.config)
-        self.analyzer = CodeAnalyzer()
+        self.analyzer = CodeAnalyzer(cache_path=self.config.cache_path,
+                                     pattern_matcher=PatternMatcher(self.config.debug_patterns))
+        self.engine = CleanupEngine(self.config, self.analyzer.pattern_matcher)
     
     def run(self, 
             files: List[str] = None,
@@ -31,11 +46,16 @@ class CleanupCommand:
             unused: bool = False,
             docs: bool = False,
             test_mode: bool = False,
-            language: str = None) -> Dict[str, Any]:
-        """Run cleanup command with specified options."""
+            language: str = None,
+            incremental: bool = False) -> Dict[str, Any]:
+        """Run cleanup command with specified options.
+        
+        With incremental, the whole-project file set is narrowed to files
+        changed since config.base_ref plus modified and untracked files.
+        """
         
         # Determine which files to process
-        target_files = self._get_target_files(files, all_files, staged, modified)
+        target_files = self._get_target_files(files, all_files, staged, modified, incremental)
         
         if not target_files:
             return {"error": "No files to process"}
@@ -47,21 +67,37 @@ class CleanupCommand:
             "details": [],
         }
         
+        if language:
+            target_files = [f for f in target_files if self._matches_language(f, language)]
+        options = {"debug": debug, "todos": todos, "unused": unused, "test_mode": test_mode}
+        
         # Process each file
-        for file_path in target_files:
-            if language and not self._matches_language(file_path, language):
-                continue
-            
-            file_results = self._process_file(
-                file_path,
-                debug=debug,
-                todos=todos,
-                unused=unused,
-                test_mode=test_mode
-            )
-            
+        workers = self.config.worker_count(len(target_files))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_command_worker,
+                                     initargs=(self,)) as executor:
+                all_results = list(executor.map(partial(_process_file_worker, **options),
+                                                target_files,
+                                                chunksize=PARALLEL_CHUNKSIZE))
+        elif self.analyzer.cache_path:
+            # Cache hits need only a stat, so reading ahead would be wasted I/O
+            all_results = [self._process_file(f, **options) for f in target_files]
+        else:
+            all_results = [
+                self._process_file(f, content=content, **options)
+                for f, content in self._prefetch(target_files)
+            ]
+        
+        for file_results in all_results:
+            # Failed files can hold partial issues; like the summary, don't count them
+            if "error" not in file_results:
+                self.engine.record(file_results)
+                results["issues_found"] += len(file_results["issues"])
+            # Details are returned as plain data so callers can serialize them
+            if "issues" in file_results:
+                file_results["issues"] = [issue.to_dict() for issue in file_results["issues"]]
             results["details"].append(file_results)
-            results["issues_found"] += len(file_results.get("issues", []))
         
         # Find duplicates if requested
         if duplicates:
@@ -77,13 +113,18 @@ class CleanupCommand:
                          files: List[str],
                          all_files: bool,
                          staged: bool,
-                         modified: bool) -> List[str]:
+                         modified: bool,
+                         incremental: bool = False) -> List[str]:
         """Get list of files to process based on options."""
         if files:
             return files
         
-        if all_files:
-            return self._get_all_files()
+        if all_files or incremental:
+            project_files = self._get_all_files()
+            if not incremental:
+                return project_files
+            changed = self._get_changed_vs_base(self.config.base_ref)
+            return [f for f in project_files if os.path.normpath(f) in changed]
         
         if staged:
             return self._get_staged_files()
@@ -95,56 +136,87 @@ class CleanupCommand:
     
     def _get_all_files(self) -> List[str]:
         """Get all files in the project."""
-        files = []
-        for path in Path(".").rglob("*"):
-            if path.is_file() and not self.config.is_excluded(str(path)):
-                files.append(str(path))
-        return files
+        return list(walk_files(".", self.config))
+    
+    def _get_changed_vs_base(self, base: str) -> Set[str]:
+        """Get files changed on this branch since base, plus local changes."""
+        changed = set()
+        commands = [
+            # Three dots diff against the merge base, i.e. this branch's own changes
+            ["git", "diff", "--name-only", "--relative", "--diff-filter=d", "-z", f"{base}...HEAD"],
+            ["git", "ls-files", "--modified", "--others", "--exclude-standard", "-z"],
+        ]
+        for cmd in commands:
+            try:
+                result = subprocess.run(cmd, capture_output=True, check=True)
+            except subprocess.CalledProcessError:
+                # A missing base ref still leaves the working tree changes
+                continue
+            changed.update(
+                os.path.normpath(os.fsdecode(f)) for f in result.stdout.split(b"\0") if f
+            )
+        return changed
     
     def _get_staged_files(self) -> List[str]:
         """Get git staged files."""
         try:
             result = subprocess.run(
-                ["git", "diff", "--cached", "--name-only"],
+                ["git", "diff", "--cached", "--name-only", "--diff-filter=d", "-z"],
                 capture_output=True,
-                text=True,
                 check=True
             )
-            return [f for f in result.stdout.strip().split("\n") if f]
+            return [os.fsdecode(f) for f in result.stdout.split(b"\0") if f]
         except subprocess.CalledProcessError:
             return []
     
     def _get_modified_files(self) -> List[str]:
-        """Get modified files in git."""
+        """Get modified and untracked files in git."""
         try:
             result = subprocess.run(
-                ["git", "diff", "--name-only"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            modified = [f for f in result.stdout.strip().split("\n") if f]
-            
-            result = subprocess.run(
-                ["git", "ls-files", "--others", "--exclude-standard"],
+                ["git", "status", "--porcelain=v1", "-z", "--untracked-files=normal"],
                 capture_output=True,
-                text=True,
                 check=True
             )
-            untracked = [f for f in result.stdout.strip().split("\n") if f]
-            
-            return modified + untracked
         except subprocess.CalledProcessError:
             return []
+        
+        files = []
+        entries = iter(result.stdout.split(b"\0"))
+        for entry in entries:
+            if not entry:
+                continue
+            status, path = entry[:2], entry[3:]
+            if status[:1] in (b"R", b"C"):
+                # Renames and copies are followed by their source path
+                next(entries, None)
+            # Keep untracked files and files changed in the working tree
+            if status == b"??" or status[1:] not in (b" ", b"D"):
+                files.append(os.fsdecode(path))
+        return files
+    
+    def _prefetch(self, file_paths: List[str]) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield (path, text) in order while threads read the next files ahead."""
+        paths = iter(file_paths)
+        with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+            pending = deque(
+                (path, executor.submit(read_text_for_scan, path))
+                for path in islice(paths, PREFETCH_WINDOW)
+            )
+            while pending:
+                path, future = pending.popleft()
+                for next_path in islice(paths, 1):
+                    pending.append((next_path, executor.submit(read_text_for_scan, next_path)))
+                yield path, future.result()
     
     def _process_file(self,
                      file_path: str,
                      debug: bool,
                      todos: bool,
                      unused: bool,
-                     test_mode: bool) -> Dict[str, Any]:
+                     test_mode: bool,
+                     content: Optional[str] = None) -> Dict[str, Any]:
         """Process a single file for cleanup."""
-        results = self.analyzer.analyze(file_path)
+        results = self.analyzer.analyze(file_path, content=content)
         
         # Filter issues based on options
         if not debug and not todos and not unused:
@@ -153,20 +225,20 @@ class CleanupCommand:
         else:
             filtered_issues = []
             for issue in results.get("issues", []):
-                if debug and issue["type"] == "debug":
+                if debug and issue.type == "debug":
                     filtered_issues.append(issue)
-                elif todos and issue["type"] == "todo":
+                elif todos and issue.type == "todo":
                     filtered_issues.append(issue)
             results["issues"] = filtered_issues
         
         # Check for unused imports if requested
         if unused and file_path.endswith('.py'):
-            unused_imports = self.analyzer.find_unused_imports(file_path)
+            python_analysis = results.get("python_analysis", {})
+            unused_imports = python_analysis.get("unused_imports", [])
             for imp in unused_imports:
-                results["issues"].append({
-                    "type": "unused_import",
-                    "content": f"Unused import: {imp}",
-                })
+                results["issues"].append(
+                    Match(None, f"Unused import: {imp}", "", "unused_import")
+                )
         
         # Apply fixes if not in test mode
         if not test_mode and results.get("issues") and self.config.auto_fix:
@@ -177,17 +249,7 @@ class CleanupCommand:
     
     def _matches_language(self, file_path: str, language: str) -> bool:
         """Check if file matches the specified language."""
-        language_extensions = {
-            "python": [".py"],
-            "javascript": [".js", ".jsx", ".ts", ".tsx"],
-            "go": [".go"],
-            "java": [".java"],
-            "ruby": [".rb"],
-            "php": [".php"],
-        }
-        
-        extensions = language_extensions.get(language.lower(), [])
-        return any(file_path.endswith(ext) for ext in extensions)
+        return detect_language(file_path) == language.lower()
     
     def format_output(self, results: Dict[str, Any]) -> str:
         """Format results for display."""
@@ -213,4 +275,20 @@ class CleanupCommand:
             output.append("✨ Cleanup Complete!")
             output.append(f"  Fixed {results['issues_fixed']} issues")
         
-        return "\n".join(output)
\ No newline at end of file
+        return "\n".join(output)
+
+
+# ==================== Process Pool Workers ====================
+
+_worker_command: Optional[CleanupCommand] = None
+
+
+def _init_command_worker(command: CleanupCommand):
+    """Install the per-process command used by _process_file_worker."""
+    global _worker_command
+    _worker_command = command
+
+
+def _process_file_worker(file_path: str, **options) -> Dict[str, Any]:
+    """Process one file in a worker process."""
+    return _worker_command._process_file(file_path, **options)
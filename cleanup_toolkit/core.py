@@ -2,10 +2,122 @@
 Core cleanup engine functionality.
 """
 
+import copy
+import fnmatch
+import functools
+import mmap
 import os
 import re
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 32
+PARALLEL_CHUNKSIZE = 16
+
+# Files with a NUL byte in their first block are treated as binary
+BINARY_SNIFF_BYTES = 8192
+
+# Files larger than this are memory-mapped and scanned as bytes
+MMAP_THRESHOLD = 256 * 1024
+
+# Scannable file contents: decoded text, or a read-only mmap of a large file
+Content = Union[str, bytes, mmap.mmap]
+
+_NEWLINE = re.compile("\n")
+
+LANGUAGE_EXTENSIONS = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "javascript",
+    ".tsx": "javascript",
+    ".go": "go",
+    ".java": "java",
+    ".rb": "ruby",
+    ".php": "php",
+    ".c": "c",
+    ".cpp": "cpp",
+    ".cs": "csharp",
+    ".rs": "rust",
+}
+
+
+def file_extension(file_path: str) -> str:
+    """Return the lower-cased extension of a path string, like Path.suffix."""
+    dot = file_path.rfind('.')
+    sep = max(file_path.rfind('/'), file_path.rfind('\\'))
+    # A leading dot names a hidden file rather than starting an extension
+    if dot <= sep + 1:
+        return ""
+    return file_path[dot:].lower()
+
+
+def detect_language(file_path: str) -> str:
+    """Detect programming language from file extension."""
+    return LANGUAGE_EXTENSIONS.get(file_extension(file_path), "unknown")
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file selected for scanning turns out to be binary."""
+
+
+@contextmanager
+def open_for_scan(file_path: str) -> Iterator[Content]:
+    """Yield a file's text, or a read-only mmap of it when the file is large."""
+    with open(file_path, 'rb') as f:
+        head = f.read(BINARY_SNIFF_BYTES)
+        if b"\0" in head:
+            raise BinaryFileError(f"{file_path} is a binary file")
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+        else:
+            yield (head + f.read()).decode('utf-8')
+
+
+def read_text_for_scan(file_path: str) -> Optional[str]:
+    """Read a small text file ahead of analysis, or return None to defer to open_for_scan."""
+    try:
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                return None
+            data = f.read()
+        if b"\0" in data[:BINARY_SNIFF_BYTES]:
+            return None
+        return data.decode('utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _bytes_pattern(pattern: "re.Pattern") -> "re.Pattern":
+    """Compile the bytes equivalent of a str pattern."""
+    return re.compile(pattern.pattern.encode('utf-8'), pattern.flags & ~re.UNICODE)
+
+
+def pattern_for(pattern: "re.Pattern", content: Content) -> "re.Pattern":
+    """Return pattern, or its bytes form when content is bytes or an mmap."""
+    return pattern if isinstance(content, str) else _bytes_pattern(pattern)
+
+
+def newline_offsets(content: Content) -> List[int]:
+    """Return the offsets of every newline character in content."""
+    return [m.start() for m in pattern_for(_NEWLINE, content).finditer(content)]
+
+
+def line_text(content: Content, newlines: List[int], index: int) -> str:
+    """Return the text of the zero-based line index using newline offsets."""
+    start = newlines[index - 1] + 1 if index else 0
+    end = newlines[index] if index < len(newlines) else len(content)
+    text = content[start:end]
+    return text if isinstance(text, str) else text.decode('utf-8', 'replace')
+
+
+def _has_glob(pattern: str) -> bool:
+    """Check if a pattern contains fnmatch wildcards."""
+    return any(c in pattern for c in "*?[")
 
 
 class CleanupConfig:
@@ -23,11 +135,27 @@ class CleanupConfig:
             "__pycache__/",
             ".git/",
         ]
-        self.debug_patterns = {
-            "python": [r"print\(", r"breakpoint\(\)", r"import pdb"],
-            "javascript": [r"console\.(log|debug|info)", r"debugger;"],
-            "go": [r"fmt\.Print", r"log\.Print"],
-        }
+        # None uses one worker per CPU; 1 disables parallel analysis
+        self.max_workers: Optional[int] = None
+        # Location of the incremental analysis cache; None disables caching
+        self.cache_path: Optional[str] = None
+        # Incremental runs only analyze files changed since this ref
+        self.base_ref = "origin/main"
+        self._debug_patterns = None
+        self._exclude_key = None
+    
+    @property
+    def debug_patterns(self) -> Dict[str, List[str]]:
+        """Per-language debug patterns (defaults unless set); engines read them when created."""
+        if self._debug_patterns is None:
+            # Imported here because analyzers depends on this module
+            from cleanup_toolkit.analyzers import DEFAULT_PATTERNS
+            self._debug_patterns = copy.deepcopy(DEFAULT_PATTERNS["debug"])
+        return self._debug_patterns
+    
+    @debug_patterns.setter
+    def debug_patterns(self, patterns: Dict[str, List[str]]):
+        self._debug_patterns = patterns
     
     def load(self) -> Dict[str, Any]:
         """Load configuration from file."""
@@ -38,23 +166,84 @@ class CleanupConfig:
             "debug_patterns": self.debug_patterns,
         }
     
+    def worker_count(self, file_count: int) -> int:
+        """Return how many worker processes to use for a batch of files."""
+        if file_count < PARALLEL_MIN_FILES:
+            return 1
+        workers = self.max_workers or os.cpu_count() or 1
+        return max(1, min(workers, file_count // PARALLEL_CHUNKSIZE))
+    
     def is_excluded(self, file_path: str) -> bool:
         """Check if file should be excluded from cleanup."""
-        path = Path(file_path)
         # Convert to forward slashes for consistent matching
-        path_str = str(path).replace('\\', '/')
-        for pattern in self.exclude_patterns:
-            if pattern in path_str:
-                return True
-        return False
+        path_str = str(file_path).replace('\\', '/')
+        exclude_dirs, exclude_re = self._exclude_matchers()
+        if any(part in exclude_dirs for part in path_str.split('/')):
+            return True
+        if exclude_re is None:
+            return False
+        return bool(exclude_re.match(path_str) or exclude_re.match(os.path.basename(path_str)))
+    
+    def is_excluded_dir(self, name: str) -> bool:
+        """Check if a directory name should be pruned from traversal."""
+        return name in self._exclude_matchers()[0]
+    
+    def _exclude_matchers(self):
+        """Compile exclude_patterns into a directory-name set and a glob regex."""
+        key = tuple(self.exclude_patterns)
+        if key != self._exclude_key:
+            dirs = set()
+            globs = []
+            for pattern in self.exclude_patterns:
+                name = pattern.rstrip('/')
+                if pattern.endswith('/') and '/' not in name and not _has_glob(name):
+                    dirs.add(name)
+                elif pattern.endswith('/'):
+                    globs.extend([name + '/*', '*/' + name + '/*'])
+                else:
+                    globs.append(pattern)
+            self._exclude_dirs = dirs
+            self._exclude_re = (
+                re.compile('|'.join(fnmatch.translate(g) for g in globs)) if globs else None
+            )
+            self._exclude_key = key
+        return self._exclude_dirs, self._exclude_re
+
+
+def walk_files(directory: str, config: CleanupConfig) -> Iterator[str]:
+    """Yield non-excluded file paths under directory, pruning excluded dirs."""
+    # Paths under "." are yielded without a "./" prefix, as rglob does
+    stack = [(directory, "" if directory == "." else directory)]
+    while stack:
+        current, prefix = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                path = os.path.join(prefix, entry.name) if prefix else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not config.is_excluded_dir(entry.name):
+                            stack.append((entry.path, path))
+                    elif entry.is_file() and not config.is_excluded(path):
+                        yield path
+                except OSError:
+                    continue
 
 
 class CleanupEngine:
     """Main engine for code cleanup operations."""
     
-    def __init__(self, config: Optional[CleanupConfig] = None):
-        """Initialize the cleanup engine."""
+    def __init__(self, config: Optional[CleanupConfig] = None, pattern_matcher=None):
+        """Initialize the cleanup engine, sharing pattern_matcher if given."""
         self.config = config or CleanupConfig()
+        if pattern_matcher is None:
+            # Imported here because analyzers depends on this module
+            from cleanup_toolkit.analyzers import PatternMatcher
+            pattern_matcher = PatternMatcher(self.config.debug_patterns)
+        self.pattern_matcher = pattern_matcher
         self.stats = {
             "files_processed": 0,
             "issues_found": 0,
@@ -69,6 +258,10 @@ class CleanupEngine:
         if self.config.is_excluded(file_path):
             return {"skipped": True, "reason": "excluded"}
         
+        language = detect_language(file_path)
+        if language == "unknown":
+            return {"skipped": True, "reason": "unsupported"}
+        
         results = {
             "file": file_path,
             "issues": [],
@@ -76,53 +269,58 @@ class CleanupEngine:
         }
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.splitlines()
-            
-            # Check for debug statements
-            language = self._detect_language(file_path)
-            if language in self.config.debug_patterns:
-                for pattern_str in self.config.debug_patterns[language]:
-                    pattern = re.compile(pattern_str)
-                    for i, line in enumerate(lines, 1):
-                        if pattern.search(line):
-                            results["issues"].append({
-                                "type": "debug",
-                                "line": i,
-                                "content": line.strip(),
-                            })
-                            self.stats["debug_statements"] += 1
+            with open_for_scan(file_path) as content:
+                newlines = newline_offsets(content)
+                matcher = self.pattern_matcher
+                results["issues"].extend(
+                    matcher.find_patterns(content, "debug", language, newlines=newlines)
+                )
+                results["issues"].extend(
+                    matcher.find_patterns(content, "todo", newlines=newlines)
+                )
             
-            # Check for TODOs
-            todo_pattern = re.compile(r"(TODO|FIXME|XXX|HACK):")
-            for i, line in enumerate(lines, 1):
-                if todo_pattern.search(line):
-                    results["issues"].append({
-                        "type": "todo",
-                        "line": i,
-                        "content": line.strip(),
-                    })
-                    self.stats["todos"] += 1
-            
-            self.stats["files_processed"] += 1
-            self.stats["issues_found"] += len(results["issues"])
+            self.record(results)
             
+        except BinaryFileError:
+            return {"skipped": True, "reason": "binary"}
         except Exception as e:
             results["error"] = str(e)
         
         return results
     
+    def record(self, results: Dict[str, Any]):
+        """Add one analyzed file's issues to the running stats."""
+        issues = results.get("issues", [])
+        self.stats["files_processed"] += 1
+        self.stats["issues_found"] += len(issues)
+        for issue in issues:
+            if issue.type == "debug":
+                self.stats["debug_statements"] += 1
+            elif issue.type == "todo":
+                self.stats["todos"] += 1
+    
     def analyze_directory(self, directory: str) -> List[Dict[str, Any]]:
         """Analyze all files in a directory."""
         results = []
-        path = Path(directory)
+        file_paths = list(walk_files(directory, self.config))
+        
+        workers = self.config.worker_count(len(file_paths))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_init_engine_worker,
+                                     initargs=(self.config, self.pattern_matcher)) as executor:
+                for result, stats in executor.map(_analyze_file_worker, file_paths,
+                                                  chunksize=PARALLEL_CHUNKSIZE):
+                    for key, value in stats.items():
+                        self.stats[key] += value
+                    if not result.get("skipped"):
+                        results.append(result)
+            return results
         
-        for file_path in path.rglob("*"):
-            if file_path.is_file():
-                result = self.analyze_file(str(file_path))
-                if not result.get("skipped"):
-                    results.append(result)
+        for file_path in file_paths:
+            result = self.analyze_file(file_path)
+            if not result.get("skipped"):
+                results.append(result)
         
         return results
     
@@ -139,23 +337,22 @@ class CleanupEngine:
     def get_summary(self) -> Dict[str, Any]:
         """Get cleanup summary statistics."""
         return self.stats.copy()
-    
-    def _detect_language(self, file_path: str) -> str:
-        """Detect programming language from file extension."""
-        ext = Path(file_path).suffix.lower()
-        language_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".ts": "javascript",
-            ".tsx": "javascript",
-            ".go": "go",
-            ".java": "java",
-            ".rb": "ruby",
-            ".php": "php",
-            ".c": "c",
-            ".cpp": "cpp",
-            ".cs": "csharp",
-            ".rs": "rust",
-        }
-        return language_map.get(ext, "unknown")
\ No newline at end of file
+
+
+# ==================== Process Pool Workers ====================
+
+_worker_engine: Optional[CleanupEngine] = None
+
+
+def _init_engine_worker(config: CleanupConfig, pattern_matcher):
+    """Create the per-process engine used by _analyze_file_worker."""
+    global _worker_engine
+    _worker_engine = CleanupEngine(config, pattern_matcher)
+
+
+def _analyze_file_worker(file_path: str) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Analyze one file in a worker, returning its result and stats delta."""
+    engine = _worker_engine
+    engine.stats = dict.fromkeys(engine.stats, 0)
+    result = engine.analyze_file(file_path)
+    return result, engine.stats
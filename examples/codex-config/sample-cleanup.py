@@ -63,6 +63,20 @@ def check_input(data):
     else:
         return False
 
+def validate_email(email):
+    import re  # Re-imported and re-compiled on every call
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+def make_record(value):
+    return {'value': value, 'created_at': datetime.now()}  # A datetime per record
+
+def make_records(values):
+    records = []
+    for v in values:
+        records.append(make_record(v))  # One call, timestamp and append per item
+    return records
+
 # ============================================
 # AFTER CODEX CLEANUP - Clean Python Code
 # ============================================
@@ -74,7 +88,13 @@ This module provides functionality for processing numerical data,
 including validation, transformation, and batch processing capabilities.
 """
 
-from typing import List, Optional, Union
+import re
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Union
+
+# Compiled once at import time rather than on every call
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
 
 def process_data(data: List[Union[int, float]]) -> List[Union[int, float]]:
@@ -214,4 +234,74 @@ def validate_input(input_data: Optional[any]) -> bool:
         return len(input_data) > 0
     
     # Non-collection types are considered valid if not None
-    return True
\ No newline at end of file
+    return True
+
+
+def validate_email(email: str) -> bool:
+    """
+    Check whether a string is a well-formed email address.
+    
+    Args:
+        email: Address to check.
+        
+    Returns:
+        True if email matches the expected format, False otherwise.
+        
+    Examples:
+        >>> validate_email("jane@example.com")
+        True
+        >>> validate_email("not-an-email")
+        False
+    """
+    return _EMAIL_RE.match(email) is not None
+
+
+def make_record(value: Union[int, float]) -> dict:
+    """
+    Wrap a value in a timestamped record.
+    
+    The timestamp is stored as integer nanoseconds from time.time_ns(),
+    which is cheap to take; format it with iso_timestamp() only when
+    the record is displayed or serialized.
+    
+    Args:
+        value: Numerical value to record.
+        
+    Returns:
+        Dictionary with the value and its creation time in nanoseconds.
+    """
+    return {'value': value, 'created_at_ns': time.time_ns()}
+
+
+def iso_timestamp(ns: int) -> str:
+    """
+    Format a time.time_ns() timestamp as an ISO 8601 string.
+    
+    Args:
+        ns: Nanoseconds since the epoch.
+        
+    Returns:
+        Local time in ISO 8601 format.
+    """
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
+def make_records(values: Iterable[Union[int, float]]) -> List[dict]:
+    """
+    Wrap many values in timestamped records in one batch.
+    
+    The whole batch shares a single timestamp and is built with one
+    list comprehension instead of a function call and append per value.
+    
+    Args:
+        values: Numerical values to record.
+        
+    Returns:
+        List of records in the same order as values.
+        
+    Examples:
+        >>> len(make_records([1, 2, 3]))
+        3
+    """
+    created_at_ns = time.time_ns()
+    return [{'value': value, 'created_at_ns': created_at_ns} for value in values]
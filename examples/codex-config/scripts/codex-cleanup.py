@@ -6,193 +6,724 @@ import openai
 import os
 import sys
 import argparse
+import ast
+import asyncio
+import hashlib
+import io
 import json
+import re
+import shutil
+import textwrap
+import time
+import tokenize
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
-class CodexCleanup:
-    def __init__(self, api_key, model="code-davinci-002"):
-        openai.api_key = api_key
-        self.model = model
+# Language for each file extension
+_EXT_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.cs': 'csharp'
+})
+
+DEFAULT_MODEL = "gpt-4o-mini"
+# Bump whenever a prompt template changes so stale completions are not reused
+PROMPT_VERSION = 4
+CACHE_DIR = Path(".cleanup-toolkit/cache")
+# Python files at least this long are cleaned one top-level unit at a time
+MODULE_SPLIT_MIN_LINES = 500
+
+# Cheap local signs that a file has something to clean up; files without any skip the API
+_COMMON_HINTS = [r'\b(?:TODO|FIXME|XXX|HACK)\b']
+_CLEANUP_HINTS = {
+    'python': [r'\bprint\(', r'\bpdb\.set_trace\(', r'\bbreakpoint\(',
+               r'^[ \t]*#[ \t]*(?:def|class|import|from|return|print|if|for|while)\b'],
+    'javascript': [r'\bconsole\.(?:log|debug|info)\(', r'\bdebugger\b', r'^[ \t]*//[ \t]*\w+\(.*\);'],
+    'typescript': [r'\bconsole\.(?:log|debug|info)\(', r'\bdebugger\b', r'^[ \t]*//[ \t]*\w+\(.*\);'],
+    'java': [r'\bSystem\.(?:out|err)\.print', r'\.printStackTrace\('],
+    'go': [r'\bfmt\.Print', r'\blog\.Print'],
+    'rust': [r'\bprintln!', r'\bdbg!'],
+    'ruby': [r'^[ \t]*(?:puts|p|pp)\b', r'\bbinding\.pry\b'],
+    'php': [r'\bvar_dump\(', r'\bprint_r\(', r'\bdie\('],
+}
+
+@lru_cache(maxsize=None)
+def _hints_regex(file_type):
+    """One alternation of every cleanup hint for file_type."""
+    patterns = _CLEANUP_HINTS.get(file_type, []) + _COMMON_HINTS
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.MULTILINE)
+
+def _has_duplicate_functions(code):
+    """Check whether two Python functions have identical bodies."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
     
-    def analyze_code(self, code, file_type="python"):
-        """Analyze code for cleanup opportunities."""
-        prompt = f"""
-Analyze this {file_type} code for cleanup opportunities:
+    seen = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        # Stub bodies (pass, ..., a lone docstring) are expected to repeat
+        if len(node.body) == 1 and isinstance(node.body[0], (ast.Pass, ast.Expr)):
+            continue
+        body = "".join(ast.dump(stmt) for stmt in node.body)
+        if body in seen:
+            return True
+        seen.add(body)
+    return False
+
+def needs_cleanup(code, file_type):
+    """Cheap pre-scan deciding whether a file is worth sending to the model."""
+    if _hints_regex(file_type).search(code):
+        return True
+    return file_type == "python" and _has_duplicate_functions(code)
+
+# Whole-line console calls the local pre-pass removes from JavaScript/TypeScript
+_CONSOLE_CALL_RE = re.compile(r'^[ \t]*console\.(?:log|debug|info)[ \t]*\([^)]*\);?[ \t]*(?:\n|$)',
+                              re.MULTILINE)
+_IDENTIFIER_RE = re.compile(r'[A-Za-z_]\w*')
+# Tool directives in comments; lines carrying them are never edited locally
+_PRAGMA_RE = re.compile(r'#[ \t]*(?:noqa|pragma|type:|pylint:|fmt:|isort:|mypy:|pyright:|ruff:)',
+                        re.IGNORECASE)
+# Modules imported for their side effects, which no name lookup reveals
+_SIDE_EFFECT_MODULES = frozenset({
+    'readline', 'rlcompleter', 'site', 'sitecustomize', 'usercustomize', 'antigravity', 'this',
+})
+# print() output that reads as a debugging aid rather than program output
+_DEBUG_TEXT_RE = re.compile(r'^\W*(?:debug|dbg|trace|here)\b', re.IGNORECASE)
+_SELF_DOC_FSTRING_RE = re.compile(r'\{[^{}=!<>]+=[ \t]*(?:![rsa])?(?::[^{}]*)?\}')
 
-{code}
+def _is_whole_line(lines, node):
+    """Check that nothing but node (and a trailing comment) sits on its lines."""
+    before = lines[node.lineno - 1].encode()[:node.col_offset]
+    after = lines[node.end_lineno - 1].encode()[node.end_col_offset:].strip()
+    return not before.strip() and (not after or after.startswith(b"#"))
 
-Identify:
+def _unused_import_edits(tree, lines):
+    """Map module-level import statements to their replacement without unused names."""
+    used = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            used.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            # Covers __all__ and string annotations
+            used.update(_IDENTIFIER_RE.findall(node.value))
+    
+    edits = {}
+    for node in tree.body:
+        if not isinstance(node, (ast.Import, ast.ImportFrom)) or not _is_whole_line(lines, node):
+            continue
+        if isinstance(node, ast.ImportFrom) and node.module == "__future__":
+            continue
+        if any(alias.name == "*" for alias in node.names):
+            continue
+        if any(_PRAGMA_RE.search(lines[i]) for i in range(node.lineno - 1, node.end_lineno)):
+            continue
+        modules = [node.module or ""] if isinstance(node, ast.ImportFrom) else \
+            [alias.name for alias in node.names]
+        if any(module.split(".")[0] in _SIDE_EFFECT_MODULES for module in modules):
+            continue
+        kept = [alias for alias in node.names
+                if (alias.asname or alias.name.split(".")[0]) in used]
+        if len(kept) == len(node.names):
+            continue
+        if kept:
+            pruned = type(node)(**{**node.__dict__, "names": kept})
+            edits[node] = ast.unparse(pruned) + "\n"
+        else:
+            edits[node] = ""
+    return edits
+
+def _commented_code_lines(code, lines):
+    """Line indexes of runs of whole-line comments that parse as Python code."""
+    comments = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            # Tool directives such as "# pylint: disable=x" can parse as code
+            if (token.type == tokenize.COMMENT and not token.line[:token.start[1]].strip()
+                    and not _PRAGMA_RE.match(token.string)):
+                comments.append(token.start[0] - 1)
+    except (tokenize.TokenError, SyntaxError):
+        return set()
+    
+    runs, run = [], []
+    for index in comments:
+        if run and index != run[-1] + 1:
+            runs.append(run)
+            run = []
+        run.append(index)
+    if run:
+        runs.append(run)
+    
+    dead = set()
+    for run in runs:
+        text = textwrap.dedent("".join(lines[i].strip()[1:] + "\n" for i in run))
+        try:
+            parsed = ast.parse(text).body
+        except (SyntaxError, ValueError):
+            continue
+        # Prose such as "# TODO: fix" or "# cleanup" parses as a name or annotation
+        if not parsed or any(
+            isinstance(stmt, ast.AnnAssign) and stmt.value is None
+            or isinstance(stmt, ast.Expr) and isinstance(stmt.value, (ast.Name, ast.Constant))
+            for stmt in parsed
+        ):
+            continue
+        dead.update(run)
+    return dead
+
+def _is_debug_print(code, call):
+    """Check whether a print() call looks like debug output rather than program output."""
+    if not call.args or any(keyword.arg == "file" for keyword in call.keywords):
+        return False
+    first = call.args[0]
+    if isinstance(first, ast.JoinedStr):
+        if _SELF_DOC_FSTRING_RE.search(ast.get_source_segment(code, first) or ""):
+            return True
+        text = "".join(value.value for value in first.values if isinstance(value, ast.Constant))
+    elif isinstance(first, ast.Constant) and isinstance(first.value, str):
+        text = first.value
+    else:
+        return False
+    return bool(_DEBUG_TEXT_RE.match(text))
+
+def _python_prepass(code):
+    """Drop unused imports, debug print() calls and commented-out code from Python source."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return code
+    
+    lines = code.splitlines(keepends=True)
+    deleted = _commented_code_lines(code, lines)
+    replacements = {}
+    
+    def remove(node, replacement=""):
+        deleted.update(range(node.lineno - 1, node.end_lineno))
+        if replacement:
+            replacements[node.lineno - 1] = replacement
+    
+    for node, replacement in _unused_import_edits(tree, lines).items():
+        remove(node, replacement)
+    
+    for parent in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            statements = getattr(parent, field, None)
+            if not isinstance(statements, list) or not statements:
+                continue
+            prints = [
+                stmt for stmt in statements
+                if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+                and isinstance(stmt.value.func, ast.Name) and stmt.value.func.id == "print"
+                and _is_debug_print(code, stmt.value) and _is_whole_line(lines, stmt)
+                and not _PRAGMA_RE.search(lines[stmt.end_lineno - 1])
+            ]
+            for stmt in prints:
+                remove(stmt)
+            if prints and len(prints) == len(statements) and not isinstance(parent, ast.Module):
+                # A block can't be empty, so its first print becomes pass
+                first = prints[0]
+                indent = lines[first.lineno - 1].encode()[:first.col_offset].decode()
+                replacements[first.lineno - 1] = f"{indent}pass\n"
+    
+    return "".join(replacements.get(i, line) for i, line in enumerate(lines)
+                   if i in replacements or i not in deleted)
+
+# Shared by every request so the provider can reuse the cached prefix (system + code)
+SYSTEM_PROMPT = """You clean up code following systematic principles.
+The user sends one source file, then a task.
+
+Task: analyze - identify:
 1. Debug statements and dead code
 2. Duplicate functions and logic
 3. Missing documentation
 4. Error handling improvements
 5. Code quality issues
 
-Analysis:
-"""
-        
-        response = openai.Completion.create(
-            engine=self.model,
-            prompt=prompt,
-            max_tokens=1024,
-            temperature=0.1
-        )
-        
-        return response.choices[0].text.strip()
-    
-    def cleanup_code(self, code, analysis, file_type="python"):
-        """Generate cleaned up code based on analysis."""
-        prompt = f"""
-Clean up this {file_type} code following systematic principles:
-
-Original code:
-{code}
-
-Issues identified:
-{analysis}
-
-Apply these improvements:
+Task: cleanup - return only the cleaned code in one fenced code block, applying these improvements:
 1. Remove debug statements and dead code
 2. Consolidate duplicate logic
 3. Add comprehensive documentation
 4. Improve error handling
 5. Enhance code quality
 
-Cleaned code:
-"""
-        
-        response = openai.Completion.create(
-            engine=self.model,
-            prompt=prompt,
-            max_tokens=2048,
-            temperature=0.1
-        )
-        
-        return response.choices[0].text.strip()
-    
-    def generate_documentation(self, code, file_type="python"):
-        """Generate comprehensive documentation for code."""
-        prompt = f"""
-Generate comprehensive documentation for this {file_type} code:
-
-{code}
-
-Include:
+Task: document - generate comprehensive documentation including:
 - Clear function/class descriptions
 - Parameter documentation
 - Return value descriptions
 - Exception handling notes
 - Usage examples where helpful
-
-Documentation:
 """
+
+def prompt_key(model, messages):
+    """Stable cache key for chat messages sent to model."""
+    prompt = json.dumps(messages, sort_keys=True)
+    return hashlib.sha256(f"{model}|{PROMPT_VERSION}|{prompt}".encode()).hexdigest()
+
+def write_atomic(path, text):
+    """Write text as UTF-8 via a temp file so a crash never leaves a truncated file."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(text, encoding='utf-8', newline='')
+    os.replace(tmp, path)
+
+async def read_stream(response, stop_at_fence=False, echo=False):
+    """Collect a streamed chat reply, optionally echoing it and stopping at its closing fence."""
+    text = ""
+    search_from = 0
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        text += delta
+        if echo:
+            print(delta, end="", flush=True)
+        if not stop_at_fence:
+            continue
+        
+        # Skip any preface and the opening fence line, then look for the closing one
+        fence = 0
+        if not text.startswith("```"):
+            fence = text.find("\n```") + 1
+            if not fence:
+                continue
+        body_start = text.find("\n", fence) + 1
+        if not body_start:
+            continue
+        end = text.find("```", max(body_start, search_from))
+        if end != -1:
+            await response.close()
+            return text[fence:end]
+        search_from = max(body_start, len(text) - 2)
+    
+    if echo:
+        print()
+    return text
+
+def _unfence(text):
+    """Strip the Markdown code fence from a code reply; raises ValueError if it has none."""
+    if not text.startswith("```"):
+        raise ValueError("reply contained no fenced code block")
+    body = text.split("\n", 1)[1] if "\n" in text else ""
+    return body.rsplit("```", 1)[0].rstrip()
+
+class _CachedCompletion:
+    """Disk cache of completions keyed by model, prompt version and prompt."""
+    
+    def __init__(self, model, cache_dir=CACHE_DIR):
+        self.model = model
+        self.cache_dir = Path(cache_dir)
+        # Entries older than CLEANUP_CACHE_TTL seconds are ignored; unset never expires
+        ttl = os.getenv("CLEANUP_CACHE_TTL")
+        self.ttl = float(ttl) if ttl else None
+    
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+    
+    def get(self, messages):
+        """Return the cached completion for messages, or None."""
+        try:
+            with open(self._path(prompt_key(self.model, messages)), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if self.ttl is not None and time.time() - entry.get("ts", 0) > self.ttl:
+            return None
+        return entry.get("text")
+    
+    def put(self, messages, text):
+        """Store a completion for messages."""
+        self.store(prompt_key(self.model, messages), text)
+    
+    def store(self, key, text):
+        """Store a completion under a key from prompt_key()."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"text": text, "ts": time.time()}, f)
+        os.replace(tmp, path)
+
+class CodexCleanup:
+    def __init__(self, api_key, model=DEFAULT_MODEL, use_cache=True):
+        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.model = model
+        self.cache = _CachedCompletion(model) if use_cache else None
+    
+    def local_prepass(self, code, file_type):
+        """Apply the deterministic cleanups locally so the model only sees the rest."""
+        if file_type == "python":
+            return _python_prepass(code)
+        if file_type in ("javascript", "typescript"):
+            return _CONSOLE_CALL_RE.sub("", code)
+        return code
+    
+    def _messages(self, code, file_type, task):
+        """Chat messages for task: shared system prompt and code first, task last."""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"```{file_type}\n{code}\n```"},
+            {"role": "user", "content": task}
+        ]
+    
+    @staticmethod
+    def _prompt_cache_key(messages):
+        """Provider cache key for the shared system prompt + code prefix."""
+        prefix = messages[0]["content"] + messages[1]["content"]
+        return hashlib.sha1(prefix.encode()).hexdigest()[:32]
+    
+    async def _complete(self, messages, max_tokens, stop_at_fence=False, echo=False):
+        """Run one streamed chat completion request and return its text."""
+        if self.cache is not None:
+            cached = self.cache.get(messages)
+            if cached is not None:
+                if echo:
+                    print(cached)
+                return cached
         
-        response = openai.Completion.create(
-            engine=self.model,
-            prompt=prompt,
-            max_tokens=1024,
-            temperature=0.1
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            prompt_cache_key=self._prompt_cache_key(messages),
+            stream=True
         )
         
-        return response.choices[0].text.strip()
+        text = (await read_stream(response, stop_at_fence, echo)).strip()
+        # A code reply without its fence is unusable; don't let the cache keep it
+        if self.cache is not None and not (stop_at_fence and not text.startswith("```")):
+            self.cache.put(messages, text)
+        return text
     
-    def detect_file_type(self, file_path):
-        """Detect programming language from file extension."""
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.cs': 'csharp'
-        }
+    async def analyze_code(self, code, file_type="python", echo=False):
+        """Analyze code for cleanup opportunities."""
+        return await self._complete(self.analyze_messages(code, file_type), max_tokens=1024,
+                                    echo=echo)
+    
+    def analyze_messages(self, code, file_type="python"):
+        """Build the analysis request."""
+        return self._messages(code, file_type, "Task: analyze\n\nAnalysis:")
+    
+    async def cleanup_code(self, code, analysis, file_type="python"):
+        """Generate cleaned up code based on analysis."""
+        modules = self._split_modules(code, file_type)
+        if modules is None:
+            return _unfence(await self._complete(
+                self.cleanup_messages(code, analysis, file_type), max_tokens=2048,
+                stop_at_fence=True))
         
-        ext = Path(file_path).suffix.lower()
-        return ext_map.get(ext, 'generic')
-
-def main():
-    parser = argparse.ArgumentParser(description="Clean up code using OpenAI Codex")
-    parser.add_argument("file", help="File to clean up")
-    parser.add_argument("--api-key", help="OpenAI API key (or set OPENAI_API_KEY env var)")
-    parser.add_argument("--model", default="code-davinci-002", help="Codex model to use")
-    parser.add_argument("--output", help="Output file (default: overwrite input)")
-    parser.add_argument("--analyze-only", action="store_true", help="Only analyze, don't clean")
-    parser.add_argument("--docs-only", action="store_true", help="Only generate documentation")
+        # Each function/class is cleaned independently and stitched back in place
+        units = [segment for segment, is_unit in modules if is_unit]
+        cleaned_units = iter(await asyncio.gather(*(
+            self._complete(self.cleanup_messages(unit, analysis, file_type, partial=True),
+                           max_tokens=2048, stop_at_fence=True)
+            for unit in units
+        )))
+        return "".join(_unfence(next(cleaned_units)) + "\n" if is_unit else segment
+                       for segment, is_unit in modules)
     
-    args = parser.parse_args()
+    def cleanup_messages(self, code, analysis, file_type="python", partial=False):
+        """Build the cleanup request."""
+        scope = ("The code is one top-level function or class from a larger file; "
+                 "return only its cleaned version.\n\n" if partial else "")
+        task = f"Task: cleanup\n\n{scope}Issues identified:\n{analysis}\n\nCleaned code:"
+        return self._messages(code, file_type, task)
     
-    # Get API key
-    api_key = args.api_key or os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("Error: OpenAI API key required")
-        print("Set OPENAI_API_KEY environment variable or use --api-key")
-        return 1
+    def _split_modules(self, code, file_type):
+        """Split long Python code into (segment, is_unit) spans around top-level defs.
+        
+        Returns None when the whole file should be sent as a single prompt.
+        """
+        if file_type != "python" or code.count("\n") < MODULE_SPLIT_MIN_LINES:
+            return None
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            return None
+        
+        lines = code.splitlines(keepends=True)
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+        
+        modules = []
+        position = 0
+        for node in tree.body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            first_line = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            start, end = offsets[first_line - 1], offsets[node.end_lineno]
+            if start > position:
+                modules.append((code[position:start], False))
+            modules.append((code[start:end], True))
+            position = end
+        
+        if position < len(code):
+            modules.append((code[position:], False))
+        if not any(is_unit for _, is_unit in modules):
+            return None
+        return modules
     
+    async def generate_documentation(self, code, file_type="python"):
+        """Generate comprehensive documentation for code."""
+        return await self._complete(self.docs_messages(code, file_type), max_tokens=1024)
+    
+    def docs_messages(self, code, file_type="python"):
+        """Build the documentation request."""
+        return self._messages(code, file_type, "Task: document\n\nDocumentation:")
+    
+    def batch_request(self, custom_id, messages, max_tokens):
+        """Build one Batch API request line for messages."""
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": 0.1,
+                "prompt_cache_key": self._prompt_cache_key(messages)
+            }
+        }
+    
+    async def submit_batch(self, requests):
+        """Upload requests as a JSONL file and start a batch; returns the batch id."""
+        payload = "".join(json.dumps(request) + "\n" for request in requests)
+        batch_file = await self.client.files.create(
+            file=("cleanup-batch.jsonl", payload.encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    async def fetch_batch(self, batch_id):
+        """Return (status, {custom_id: text}) for a batch; results only once completed."""
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            return batch.status, {}
+        
+        content = await self.client.files.content(batch.output_file_id)
+        results = {}
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                message = response["body"]["choices"][0]["message"]
+                results[entry["custom_id"]] = message["content"].strip()
+        return batch.status, results
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def detect_file_type(file_path):
+        """Detect programming language from file extension."""
+        return _EXT_MAP.get(os.path.splitext(file_path)[1].lower(), 'generic')
+
+async def process_file(cleanup, path, args):
+    """Analyze and clean up one file; returns an exit code."""
     # Read file
     try:
-        with open(args.file, 'r') as f:
-            code = f.read()
+        code = Path(path).read_text(encoding='utf-8', errors='replace')
     except FileNotFoundError:
-        print(f"Error: File not found: {args.file}")
+        print(f"Error: File not found: {path}")
         return 1
     
-    # Initialize Codex
-    cleanup = CodexCleanup(api_key, args.model)
-    file_type = cleanup.detect_file_type(args.file)
+    file_type = cleanup.detect_file_type(path)
     
-    print(f"Processing {args.file} as {file_type} code...")
+    if not args.docs_only and not args.force and not needs_cleanup(code, file_type):
+        print(f"✨ {path} already clean")
+        return 0
     
-    # Analyze code
-    print("🔍 Analyzing code...")
-    analysis = cleanup.analyze_code(code, file_type)
-    print(f"\n📊 Analysis:\n{analysis}\n")
+    print(f"Processing {path} as {file_type} code...")
     
-    if args.analyze_only:
-        return 0
+    original = code
+    if not (args.analyze_only or args.docs_only):
+        # The model works on the locally cleaned code, so local edits are only
+        # written after the same analysis and cleanup pass as the model's own
+        code = cleanup.local_prepass(code, file_type)
     
     # Generate documentation
     if args.docs_only:
-        print("📝 Generating documentation...")
-        docs = cleanup.generate_documentation(code, file_type)
-        print(f"\n📚 Documentation:\n{docs}\n")
+        # Documentation doesn't depend on the analysis, so request both at once
+        print(f"🔍📝 Analyzing and documenting {path}...")
+        analysis, docs = await asyncio.gather(
+            cleanup.analyze_code(code, file_type),
+            cleanup.generate_documentation(code, file_type)
+        )
+        print(f"\n📊 Analysis of {path}:\n{analysis}\n")
+        print(f"\n📚 Documentation for {path}:\n{docs}\n")
         
         # Save documentation
-        doc_file = args.output or f"{args.file}.docs.md"
-        with open(doc_file, 'w') as f:
-            f.write(docs)
+        doc_file = args.output or f"{path}.docs.md"
+        write_atomic(doc_file, docs)
         print(f"✅ Documentation saved to {doc_file}")
         return 0
     
+    # Analyze code, streaming it to the terminal unless other files share it
+    print(f"🔍 Analyzing {path}...")
+    echo = len(args.files) == 1
+    if echo:
+        print(f"\n📊 Analysis of {path}:")
+    analysis = await cleanup.analyze_code(code, file_type, echo=echo)
+    if not echo:
+        print(f"\n📊 Analysis of {path}:\n{analysis}\n")
+    
+    if args.analyze_only:
+        return 0
+    
     # Clean up code
-    print("🧹 Cleaning up code...")
-    cleaned_code = cleanup.cleanup_code(code, analysis, file_type)
+    print(f"🧹 Cleaning up {path}...")
+    try:
+        cleaned_code = await cleanup.cleanup_code(code, analysis, file_type)
+    except ValueError as e:
+        print(f"Error: Cleanup of {path} failed: {e}")
+        return 1
     
+    return write_cleaned(path, original, cleaned_code, args)
+
+def write_cleaned(path, code, cleaned_code, args):
+    """Summarize and write cleaned code, backing up the original; returns an exit code."""
     # Show summary
     orig_lines = len(code.splitlines())
     clean_lines = len(cleaned_code.splitlines())
-    print(f"\n📈 Summary:")
+    print(f"\n📈 Summary for {path}:")
     print(f"  Lines: {orig_lines} → {clean_lines} ({clean_lines - orig_lines:+d})")
     
     # Write output
-    output_file = args.output or args.file
+    output_file = args.output or path
     
-    if output_file == args.file:
+    if output_file == path:
         # Create backup
-        backup_file = f"{args.file}.backup"
-        with open(backup_file, 'w') as f:
-            f.write(code)
+        backup_file = f"{path}.backup"
+        shutil.copyfile(path, backup_file)
         print(f"  Backup: {backup_file}")
     
-    with open(output_file, 'w') as f:
-        f.write(cleaned_code)
+    write_atomic(output_file, cleaned_code)
     
     print(f"\n✅ Cleaned code written to {output_file}")
     return 0
 
+async def submit_batch(cleanup, args):
+    """Queue analysis or documentation for every file as one Batch API job."""
+    task = "docs" if args.docs_only else "analyze"
+    requests = []
+    for path in args.files:
+        try:
+            code = Path(path).read_text(encoding='utf-8', errors='replace')
+        except FileNotFoundError:
+            print(f"Error: File not found: {path}")
+            return 1
+        
+        file_type = cleanup.detect_file_type(path)
+        if task == "docs":
+            messages = cleanup.docs_messages(code, file_type)
+        else:
+            messages = cleanup.analyze_messages(code, file_type)
+        # The prompt key lets --resume-batch fill the completion cache
+        custom_id = f"{path}:{task}:{prompt_key(cleanup.model, messages)}"
+        requests.append(cleanup.batch_request(custom_id, messages, max_tokens=1024))
+    
+    batch_id = await cleanup.submit_batch(requests)
+    print(f"📦 Submitted {len(requests)} request(s) as batch {batch_id}")
+    print(f"   Resume with: --resume-batch {batch_id}")
+    return 0
+
+async def resume_batch(cleanup, args):
+    """Fetch a finished batch and write its results."""
+    status, results = await cleanup.fetch_batch(args.resume_batch)
+    if status != "completed":
+        print(f"⏳ Batch {args.resume_batch} is {status}")
+        return 1
+    
+    for custom_id, text in results.items():
+        path, task, key = custom_id.rsplit(":", 2)
+        if cleanup.cache is not None:
+            cleanup.cache.store(key, text)
+        
+        if task == "docs":
+            doc_file = f"{path}.docs.md"
+            write_atomic(doc_file, text)
+            print(f"✅ Documentation saved to {doc_file}")
+        else:
+            print(f"\n📊 Analysis of {path}:\n{text}\n")
+    return 0
+
+async def run(args, api_key):
+    """Process every file concurrently, bounded by --concurrency."""
+    cleanup = CodexCleanup(api_key, args.model, use_cache=not args.no_cache)
+    if args.resume_batch:
+        return await resume_batch(cleanup, args)
+    if args.batch:
+        return await submit_batch(cleanup, args)
+    
+    semaphore = asyncio.Semaphore(args.concurrency)
+    
+    async def bounded(path):
+        async with semaphore:
+            return await process_file(cleanup, path, args)
+    
+    results = await asyncio.gather(*(bounded(path) for path in args.files))
+    return max(results, default=0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean up code using OpenAI Codex")
+    parser.add_argument("files", nargs="*", metavar="file", help="File(s) to clean up")
+    parser.add_argument("--api-key", help="OpenAI API key (or set OPENAI_API_KEY env var)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Chat model to use")
+    parser.add_argument("--output", help="Output file (default: overwrite input)")
+    parser.add_argument("--analyze-only", action="store_true", help="Only analyze, don't clean")
+    parser.add_argument("--docs-only", action="store_true", help="Only generate documentation")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum files processed at once (default: 4)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the API instead of reusing cached completions")
+    parser.add_argument("--force", action="store_true",
+                        help="Send files to the API even when the local pre-scan finds nothing")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit --analyze-only/--docs-only requests to the Batch API "
+                             "(half price, results within 24h)")
+    parser.add_argument("--resume-batch", metavar="BATCH_ID",
+                        help="Fetch the results of a submitted batch")
+    
+    args = parser.parse_args()
+    
+    if not args.files and not args.resume_batch:
+        parser.error("at least one file is required")
+    
+    if args.batch and not (args.analyze_only or args.docs_only):
+        print("Error: --batch requires --analyze-only or --docs-only")
+        return 1
+    
+    if args.output and len(args.files) > 1:
+        print("Error: --output can only be used with a single file")
+        return 1
+    
+    # Get API key
+    api_key = args.api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OpenAI API key required")
+        print("Set OPENAI_API_KEY environment variable or use --api-key")
+        return 1
+    
+    return asyncio.run(run(args, api_key))
+
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -3,65 +3,346 @@
 Interactive Codex cleanup session with user confirmation
 """
 import openai
+import ast
+import atexit
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional
+import asyncio
+import collections
 import difflib
+import hashlib
+import heapq
+import itertools
 import json
+import re
+import shutil
+import time
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Language for each file extension
+_EXT_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.cs': 'csharp',
+    '.swift': 'swift',
+    '.kt': 'kotlin'
+})
+
+# Files whose API calls may be in flight at the same time
+MAX_CONCURRENT_FILES = 4
+# Sessions with more files than this are offered Batch API analysis
+BATCH_OFFER_THRESHOLD = 10
+
+REPORT_DIR = Path(".cleanup-toolkit/reports")
+
+# Token budget for the code embedded in the analysis prompt
+ANALYSIS_TOKEN_BUDGET = 1500
+# Rough size of a token when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+
+# Diff lines shown at each end of a long diff
+DIFF_CONTEXT_LINES = 25
+
+# Summary counters, each a single pass over the whole text
+_DEBUG_RE = re.compile(r'print\(|console\.(?:log|debug)|debugger|var_dump')
+_DOC_RE = re.compile(r'^[ \t]*(?:"""|\'\'\'|/\*\*|//|#)', re.MULTILINE)
+
+# Cheap local signs that a file has something to clean up; files without any skip the API
+_COMMON_HINTS = [r'\b(?:TODO|FIXME|XXX|HACK)\b']
+_CLEANUP_HINTS = {
+    'python': [r'\bprint\(', r'\bpdb\.set_trace\(', r'\bbreakpoint\(',
+               r'^[ \t]*#[ \t]*(?:def|class|import|from|return|print|if|for|while)\b'],
+    'javascript': [r'\bconsole\.(?:log|debug|info)\(', r'\bdebugger\b', r'^[ \t]*//[ \t]*\w+\(.*\);'],
+    'typescript': [r'\bconsole\.(?:log|debug|info)\(', r'\bdebugger\b', r'^[ \t]*//[ \t]*\w+\(.*\);'],
+    'java': [r'\bSystem\.(?:out|err)\.print', r'\.printStackTrace\('],
+    'go': [r'\bfmt\.Print', r'\blog\.Print'],
+    'rust': [r'\bprintln!', r'\bdbg!'],
+    'ruby': [r'^[ \t]*(?:puts|p|pp)\b', r'\bbinding\.pry\b'],
+    'php': [r'\bvar_dump\(', r'\bprint_r\(', r'\bdie\('],
+}
+
+@lru_cache(maxsize=None)
+def _hints_regex(file_type):
+    """One alternation of every cleanup hint for file_type."""
+    patterns = _CLEANUP_HINTS.get(file_type, []) + _COMMON_HINTS
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.MULTILINE)
+
+def _has_duplicate_functions(code):
+    """Check whether two Python functions have identical bodies."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    
+    seen = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        # Stub bodies (pass, ..., a lone docstring) are expected to repeat
+        if len(node.body) == 1 and isinstance(node.body[0], (ast.Pass, ast.Expr)):
+            continue
+        body = "".join(ast.dump(stmt) for stmt in node.body)
+        if body in seen:
+            return True
+        seen.add(body)
+    return False
+
+def needs_cleanup(code, file_type):
+    """Cheap pre-scan deciding whether a file is worth sending to the model."""
+    if _hints_regex(file_type).search(code):
+        return True
+    return file_type == "python" and _has_duplicate_functions(code)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+# Bump whenever a prompt template changes so stale completions are not reused
+PROMPT_VERSION = 3
+CACHE_DIR = Path(".cleanup-toolkit/cache")
+
+# Shared by every request so the provider can reuse the cached prefix (system + code)
+SYSTEM_PROMPT = """You clean up code following systematic principles.
+The user sends one source file, then a task.
+
+Task: analyze - identify and list:
+1. Debug statements and console output
+2. Duplicate or similar functions
+3. Missing or inadequate documentation
+4. Poor error handling
+5. Code quality issues
+6. Unused imports or variables
+
+Task: cleanup - return only the cleaned code in one fenced code block, applying these systematic improvements:
+1. Remove all debug statements and console output
+2. Consolidate duplicate logic
+3. Add comprehensive documentation
+4. Improve error handling
+5. Follow best practices for the file's language
+"""
+
+def prompt_key(model, messages):
+    """Stable cache key for chat messages sent to model."""
+    prompt = json.dumps(messages, sort_keys=True)
+    return hashlib.sha256(f"{model}|{PROMPT_VERSION}|{prompt}".encode()).hexdigest()
+
+def write_atomic(path, text):
+    """Write text as UTF-8 via a temp file so a crash never leaves a truncated file."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(text, encoding='utf-8', newline='')
+    os.replace(tmp, path)
+
+async def read_stream(response, stop_at_fence=False, echo=False):
+    """Collect a streamed chat reply, optionally echoing it and stopping at its closing fence."""
+    text = ""
+    search_from = 0
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content or ""
+        text += delta
+        if echo:
+            print(delta, end="", flush=True)
+        if not stop_at_fence:
+            continue
+        
+        # Skip any preface and the opening fence line, then look for the closing one
+        fence = 0
+        if not text.startswith("```"):
+            fence = text.find("\n```") + 1
+            if not fence:
+                continue
+        body_start = text.find("\n", fence) + 1
+        if not body_start:
+            continue
+        end = text.find("```", max(body_start, search_from))
+        if end != -1:
+            await response.close()
+            return text[fence:end]
+        search_from = max(body_start, len(text) - 2)
+    
+    if echo:
+        print()
+    return text
+
+def _unfence(text):
+    """Strip the Markdown code fence from a code reply; raises ValueError if it has none."""
+    if not text.startswith("```"):
+        raise ValueError("reply contained no fenced code block")
+    body = text.split("\n", 1)[1] if "\n" in text else ""
+    return body.rsplit("```", 1)[0].rstrip()
+
+class _CachedCompletion:
+    """Disk cache of completions keyed by model, prompt version and prompt."""
+    
+    def __init__(self, model, cache_dir=CACHE_DIR):
+        self.model = model
+        self.cache_dir = Path(cache_dir)
+        # Entries older than CLEANUP_CACHE_TTL seconds are ignored; unset never expires
+        ttl = os.getenv("CLEANUP_CACHE_TTL")
+        self.ttl = float(ttl) if ttl else None
+    
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+    
+    def get(self, messages):
+        """Return the cached completion for messages, or None."""
+        try:
+            with open(self._path(prompt_key(self.model, messages)), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if self.ttl is not None and time.time() - entry.get("ts", 0) > self.ttl:
+            return None
+        return entry.get("text")
+    
+    def put(self, messages, text):
+        """Store a completion for messages."""
+        self.store(prompt_key(self.model, messages), text)
+    
+    def store(self, key, text):
+        """Store a completion under a key from prompt_key()."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump({"text": text, "ts": time.time()}, f)
+        os.replace(tmp, path)
 
 class InteractiveCleanup:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, use_cache=True):
         """Initialize interactive cleanup session."""
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OpenAI API key required")
         
-        openai.api_key = api_key
-        self.model = "code-davinci-002"
-        self.session_log = []
+        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.model = DEFAULT_MODEL
+        self._enc = self._load_encoding(self.model)
+        self.cache = _CachedCompletion(self.model) if use_cache else None
+        
+        # Entries are streamed to disk as they happen so an interrupted session keeps them
+        REPORT_DIR.mkdir(parents=True, exist_ok=True)
+        self._log_path = REPORT_DIR / "codex-session.ndjson"
+        self._log_fh = open(self._log_path, 'a', buffering=1)
+        self._log_start = self._log_fh.tell()
+        atexit.register(self._log_fh.close)
+        # Only the API calls run concurrently; the terminal is shared
+        self._input_lock = asyncio.Lock()
+        # Files take the terminal in the order given; finished indexes wait in a heap
+        self._turn = asyncio.Condition()
+        self._next_to_show = 0
+        self._finished = []
     
-    def start_session(self, files: List[str]):
+    async def start_session(self, files: List[str]):
         """Start interactive cleanup session."""
         print("🧹 Starting systematic cleanup session with OpenAI Codex...")
         print(f"📁 Files to process: {len(files)}\n")
         
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+        
+        async def bounded(index, file_path):
+            async with semaphore:
+                try:
+                    await self.process_file(file_path, index)
+                finally:
+                    await self._end_turn(index)
+        
+        existing = []
         for file_path in files:
             if Path(file_path).exists():
-                self.process_file(file_path)
+                existing.append(file_path)
             else:
                 print(f"⚠️ File not found: {file_path}")
         
+        if len(existing) > BATCH_OFFER_THRESHOLD and self.cache is not None:
+            answer = await self._ask(f"❓ Submit analysis of {len(existing)} files as a "
+                                     "Batch API job (half price, results within 24h)? (y/N): ")
+            if answer.startswith('y'):
+                await self.submit_analysis_batch(existing)
+                return
+        
+        await asyncio.gather(*(bounded(index, file_path)
+                               for index, file_path in enumerate(existing)))
+        
         self.generate_session_report()
     
-    def process_file(self, file_path: str):
+    async def _ask(self, prompt: str) -> str:
+        """Read an answer on a worker thread so other files' API calls keep running."""
+        async with self._input_lock:
+            return (await asyncio.to_thread(input, prompt)).lower()
+    
+    async def _wait_turn(self, index: Optional[int]):
+        """Wait until every file before index has finished with the terminal."""
+        if index is None:
+            return
+        async with self._turn:
+            await self._turn.wait_for(lambda: self._next_to_show == index)
+    
+    async def _end_turn(self, index: int):
+        """Mark file index as done and pass the terminal on in order."""
+        async with self._turn:
+            heapq.heappush(self._finished, index)
+            while self._finished and self._finished[0] == self._next_to_show:
+                heapq.heappop(self._finished)
+                self._next_to_show += 1
+            self._turn.notify_all()
+    
+    async def process_file(self, file_path: str, index: Optional[int] = None):
         """Process a single file interactively."""
-        print(f"\n{'='*60}")
-        print(f"📁 Processing: {file_path}")
-        print(f"{'='*60}")
-        
         # Read file
-        with open(file_path, 'r') as f:
-            original_code = f.read()
+        original_code = Path(file_path).read_text(encoding='utf-8', errors='replace')
         
         file_type = self.detect_file_type(file_path)
         
+        if not needs_cleanup(original_code, file_type):
+            print(f"✨ {file_path} already clean")
+            self._log({'file': file_path, 'status': 'clean'})
+            return
+        
+        # (call, cache_hit) for every completion made for this file
+        calls = []
+        
         # Step 1: Analysis
-        print("\n🔍 Analyzing code with Codex...")
-        analysis = self.analyze_code(original_code, file_type)
+        print(f"🔍 Analyzing {file_path} with Codex...")
+        analysis = await self.analyze_code(original_code, file_type, calls)
+        
+        await self._wait_turn(index)
+        print(f"\n{'='*60}")
+        print(f"📁 Processing: {file_path}")
+        print(f"{'='*60}")
         
         print(f"\n📊 Analysis Results:")
         print("-" * 40)
         print(analysis)
         print("-" * 40)
         
-        proceed = input("\n❓ Proceed with cleanup? (y/N/s[kip]): ").lower()
+        proceed = await self._ask("\n❓ Proceed with cleanup? (y/N/s[kip]): ")
+        
         if proceed in ['s', 'skip']:
             print(f"⏭️ Skipped {file_path}")
-            self.session_log.append({
+            self._log({
                 'file': file_path,
                 'status': 'skipped',
-                'reason': 'User skipped'
+                'reason': 'User skipped',
+                'calls': calls
             })
             return
         
@@ -69,151 +350,268 @@ class InteractiveCleanup:
             return
         
         # Step 2: Cleanup
-        print("\n🛠️ Generating cleaned code with Codex...")
-        cleaned_code = self.cleanup_code(original_code, analysis, file_type)
+        print(f"🛠️ Generating cleaned code for {file_path} with Codex...")
+        try:
+            cleaned_code = await self.cleanup_code(original_code, analysis, file_type, calls)
+        except ValueError as e:
+            print(f"❌ Cleanup of {file_path} failed: {e}")
+            self._log({
+                'file': file_path,
+                'status': 'failed',
+                'reason': str(e),
+                'calls': calls
+            })
+            return
+        # Split once; the diff, summary and log all work from these
+        orig_lines = original_code.splitlines()
+        clean_lines = cleaned_code.splitlines()
         
         # Step 3: Show diff
-        print("\n📊 Proposed Changes:")
-        self.show_diff(original_code, cleaned_code)
+        print(f"\n📊 Proposed Changes for {file_path}:")
+        self.show_diff(orig_lines, clean_lines)
         
         # Step 4: Summary
         print("\n📈 Cleanup Summary:")
-        self.show_summary(original_code, cleaned_code)
+        self.show_summary(original_code, cleaned_code, orig_lines, clean_lines)
         
         # Step 5: Apply changes
-        apply = input("\n❓ Apply changes? (y/N/v[iew]): ").lower()
+        apply = await self._ask("\n❓ Apply changes? (y/N/v[iew]): ")
         
         if apply == 'v':
             print("\n📄 Cleaned Code:")
             print("-" * 40)
             print(cleaned_code)
             print("-" * 40)
-            apply = input("\n❓ Apply changes now? (y/N): ").lower()
+            apply = await self._ask("\n❓ Apply changes now? (y/N): ")
         
         if apply.startswith('y'):
             # Create backup
             backup_path = f"{file_path}.backup"
-            with open(backup_path, 'w') as f:
-                f.write(original_code)
+            shutil.copyfile(file_path, backup_path)
             
             # Write cleaned code
-            with open(file_path, 'w') as f:
-                f.write(cleaned_code)
+            write_atomic(file_path, cleaned_code)
             
             print(f"✅ Applied changes to {file_path}")
             print(f"💾 Backup saved to {backup_path}")
             
-            self.session_log.append({
+            self._log({
                 'file': file_path,
                 'status': 'cleaned',
                 'analysis': analysis,
-                'lines_changed': len(cleaned_code.splitlines()) - len(original_code.splitlines())
+                'lines_changed': len(clean_lines) - len(orig_lines),
+                'calls': calls
             })
         else:
             print(f"⏭️ Changes not applied to {file_path}")
-            self.session_log.append({
+            self._log({
                 'file': file_path,
                 'status': 'analyzed',
-                'reason': 'User declined changes'
+                'reason': 'User declined changes',
+                'calls': calls
             })
     
-    def analyze_code(self, code: str, file_type: str) -> str:
-        """Analyze code for cleanup opportunities."""
-        prompt = f"""
-Analyze this {file_type} code for systematic cleanup opportunities:
-
-```{file_type}
-{code[:2000]}  # Truncate for analysis
-```
-
-Identify and list:
-1. Debug statements and console output
-2. Duplicate or similar functions
-3. Missing or inadequate documentation
-4. Poor error handling
-5. Code quality issues
-6. Unused imports or variables
-
-Provide specific, actionable findings:
-"""
-        
-        response = openai.Completion.create(
-            engine=self.model,
-            prompt=prompt,
-            max_tokens=500,
-            temperature=0.1
+    @staticmethod
+    def _load_encoding(model: str):
+        """Tokenizer for model, or None when tiktoken is unavailable."""
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count (or, without tiktoken, estimate) the tokens in text."""
+        if self._enc is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self._enc.encode(text))
+    
+    def _truncate_to_tokens(self, code: str, budget: int) -> str:
+        """Trim code to about budget tokens, cutting between top-level units when possible."""
+        if self._count_tokens(code) <= budget:
+            return code
+        
+        lines = code.splitlines(keepends=True)
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            tree = None
+        
+        if tree is not None:
+            # Keep whole top-level statements (functions, classes, imports) while they fit
+            kept, used, start = [], 0, 0
+            for node in tree.body:
+                segment = "".join(lines[start:node.end_lineno])
+                cost = self._count_tokens(segment)
+                if used + cost > budget:
+                    break
+                kept.append(segment)
+                used += cost
+                start = node.end_lineno
+            if kept:
+                return "".join(kept)
+        
+        # Not Python, or the first unit alone is over budget: cut at a line boundary
+        if self._enc is not None:
+            head = self._enc.decode(self._enc.encode(code)[:budget])
+        else:
+            head = code[:budget * CHARS_PER_TOKEN]
+        cut = head.rfind("\n")
+        return head[:cut + 1] if cut > 0 else head
+    
+    def _messages(self, code: str, file_type: str, task: str) -> List[Dict[str, str]]:
+        """Chat messages for task: shared system prompt and code first, task last."""
+        return [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': f"```{file_type}\n{code}\n```"},
+            {'role': 'user', 'content': task}
+        ]
+    
+    @staticmethod
+    def _prompt_cache_key(messages: List[Dict[str, str]]) -> str:
+        """Provider cache key for the shared system prompt + code prefix."""
+        prefix = messages[0]['content'] + messages[1]['content']
+        return hashlib.sha1(prefix.encode()).hexdigest()[:32]
+    
+    async def _complete(self, messages: List[Dict[str, str]], call: str,
+                        calls: List[Dict[str, Any]] = None, stop_at_fence: bool = False,
+                        **kwargs) -> str:
+        """Run one streamed chat completion request, reusing a cached result when possible."""
+        text = self.cache.get(messages) if self.cache is not None else None
+        if calls is not None:
+            calls.append({'call': call, 'cache_hit': text is not None})
+        if text is not None:
+            return text
+        
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.1,
+            prompt_cache_key=self._prompt_cache_key(messages),
+            stream=True,
+            **kwargs
         )
         
-        return response.choices[0].text.strip()
+        text = (await read_stream(response, stop_at_fence)).strip()
+        # A code reply without its fence is unusable; don't let the cache keep it
+        if self.cache is not None and not (stop_at_fence and not text.startswith("```")):
+            self.cache.put(messages, text)
+        return text
     
-    def cleanup_code(self, code: str, analysis: str, file_type: str) -> str:
-        """Generate cleaned up code."""
-        prompt = f"""
-Clean up this {file_type} code based on the analysis:
-
-Analysis findings:
-{analysis}
-
-Original code:
-```{file_type}
-{code}
-```
-
-Apply these systematic improvements:
-1. Remove all debug statements and console output
-2. Consolidate duplicate logic
-3. Add comprehensive documentation
-4. Improve error handling
-5. Follow best practices for {file_type}
-
-Cleaned code:
-```{file_type}
-"""
-        
-        response = openai.Completion.create(
-            engine=self.model,
-            prompt=prompt,
-            max_tokens=2048,
-            temperature=0.1,
-            stop=["```"]
+    async def submit_analysis_batch(self, files: List[str]):
+        """Queue the analysis of files as one Batch API job."""
+        lines = []
+        for file_path in files:
+            code = Path(file_path).read_text(encoding='utf-8', errors='replace')
+            messages = self.analyze_messages(code, self.detect_file_type(file_path))
+            lines.append(json.dumps({
+                # The prompt key lets resume_batch fill the completion cache
+                'custom_id': f"{file_path}:analyze:{prompt_key(self.model, messages)}",
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {'model': self.model, 'messages': messages,
+                         'max_tokens': 500, 'temperature': 0.1,
+                         'prompt_cache_key': self._prompt_cache_key(messages)}
+            }) + "\n")
+        
+        batch_file = await self.client.files.create(
+            file=("cleanup-batch.jsonl", "".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
         )
         
-        return response.choices[0].text.strip()
+        print(f"📦 Submitted {len(lines)} analyses as batch {batch.id}")
+        print(f"   Once it completes run: interactive-cleanup.py --resume-batch {batch.id}")
+        print("   then start the session again to review cached analyses.")
+    
+    async def resume_batch(self, batch_id: str) -> bool:
+        """Store the analyses of a completed batch in the cache."""
+        if self.cache is None:
+            print("⚠️ Batch results are delivered through the cache; drop --no-cache")
+            return False
+        
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"⏳ Batch {batch_id} is {batch.status}")
+            return False
+        
+        content = await self.client.files.content(batch.output_file_id)
+        stored = 0
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            response = entry.get('response') or {}
+            if response.get('status_code') != 200:
+                continue
+            _, _, key = entry['custom_id'].rsplit(":", 2)
+            self.cache.store(key, response['body']['choices'][0]['message']['content'].strip())
+            stored += 1
+        
+        print(f"💾 Cached {stored} analyses from batch {batch_id}")
+        return True
+    
+    async def analyze_code(self, code: str, file_type: str,
+                           calls: List[Dict[str, Any]] = None) -> str:
+        """Analyze code for cleanup opportunities."""
+        return await self._complete(self.analyze_messages(code, file_type), 'analyze', calls,
+                                    max_tokens=500)
     
-    def show_diff(self, original: str, cleaned: str):
-        """Show unified diff between original and cleaned code."""
+    def analyze_messages(self, code: str, file_type: str) -> List[Dict[str, str]]:
+        """Build the analysis request."""
+        code = self._truncate_to_tokens(code, ANALYSIS_TOKEN_BUDGET)
+        return self._messages(code, file_type,
+                              "Task: analyze\n\nProvide specific, actionable findings:")
+    
+    async def cleanup_code(self, code: str, analysis: str, file_type: str,
+                           calls: List[Dict[str, Any]] = None) -> str:
+        """Generate cleaned up code."""
+        task = f"Task: cleanup\n\nAnalysis findings:\n{analysis}\n\nCleaned code:"
+        text = await self._complete(self._messages(code, file_type, task), 'cleanup', calls,
+                                    max_tokens=2048, stop_at_fence=True)
+        return _unfence(text)
+    
+    def show_diff(self, orig_lines: List[str], clean_lines: List[str]):
+        """Show unified diff between original and cleaned lines."""
         diff = difflib.unified_diff(
-            original.splitlines(keepends=True),
-            cleaned.splitlines(keepends=True),
+            orig_lines,
+            clean_lines,
             fromfile="original",
             tofile="cleaned",
-            n=3
+            n=3,
+            lineterm=''
         )
         
-        diff_text = ''.join(diff)
-        if diff_text:
-            # Limit diff output
-            lines = diff_text.splitlines()
-            if len(lines) > 50:
-                print('\n'.join(lines[:25]))
-                print(f"\n... ({len(lines) - 50} lines omitted) ...\n")
-                print('\n'.join(lines[-25:]))
-            else:
-                print(diff_text)
-        else:
+        # Limit diff output without materializing the whole diff
+        head = list(itertools.islice(diff, DIFF_CONTEXT_LINES))
+        if not head:
             print("No changes detected")
+            return
+        
+        remaining = 0
+        tail = collections.deque(maxlen=DIFF_CONTEXT_LINES)
+        for line in diff:
+            remaining += 1
+            tail.append(line)
+        
+        print('\n'.join(head))
+        omitted = remaining - len(tail)
+        if omitted:
+            print(f"\n... ({omitted} lines omitted) ...\n")
+        if tail:
+            print('\n'.join(tail))
     
-    def show_summary(self, original: str, cleaned: str):
+    def show_summary(self, original: str, cleaned: str,
+                     orig_lines: List[str], clean_lines: List[str]):
         """Show cleanup summary statistics."""
-        orig_lines = original.splitlines()
-        clean_lines = cleaned.splitlines()
-        
         # Count debug statements
-        debug_patterns = ['print(', 'console.log', 'console.debug', 'debugger', 'var_dump']
-        debug_original = sum(1 for line in orig_lines 
-                           for pattern in debug_patterns if pattern in line)
-        debug_cleaned = sum(1 for line in clean_lines 
-                          for pattern in debug_patterns if pattern in line)
+        debug_original = len(_DEBUG_RE.findall(original))
+        debug_cleaned = len(_DEBUG_RE.findall(cleaned))
         
         print(f"  Lines: {len(orig_lines)} → {len(clean_lines)} "
               f"({len(clean_lines) - len(orig_lines):+d})")
@@ -222,37 +620,28 @@ Cleaned code:
             print(f"  Debug statements removed: {debug_original - debug_cleaned}")
         
         # Check for documentation improvements
-        doc_patterns = ['"""', "'''", '/**', '//', '#']
-        doc_original = sum(1 for line in orig_lines 
-                         for pattern in doc_patterns if line.strip().startswith(pattern))
-        doc_cleaned = sum(1 for line in clean_lines 
-                        for pattern in doc_patterns if line.strip().startswith(pattern))
+        doc_original = len(_DOC_RE.findall(original))
+        doc_cleaned = len(_DOC_RE.findall(cleaned))
         
         if doc_cleaned > doc_original:
             print(f"  Documentation lines added: {doc_cleaned - doc_original}")
     
-    def detect_file_type(self, file_path: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def detect_file_type(file_path: str) -> str:
         """Detect programming language from file extension."""
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.jsx': 'javascript',
-            '.ts': 'typescript',
-            '.tsx': 'typescript',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.cs': 'csharp',
-            '.swift': 'swift',
-            '.kt': 'kotlin'
-        }
-        
-        ext = Path(file_path).suffix.lower()
-        return ext_map.get(ext, 'text')
+        return _EXT_MAP.get(os.path.splitext(file_path)[1].lower(), 'text')
+    
+    def _log(self, entry: Dict[str, Any]):
+        """Append one session log entry to the ndjson log."""
+        self._log_fh.write(json.dumps(entry) + "\n")
+    
+    def _read_log(self) -> List[Dict[str, Any]]:
+        """Read back this session's entries from the ndjson log."""
+        self._log_fh.flush()
+        with open(self._log_path, 'r') as f:
+            f.seek(self._log_start)
+            return [json.loads(line) for line in f if line.strip()]
     
     def generate_session_report(self):
         """Generate and save cleanup session report."""
@@ -260,37 +649,51 @@ Cleaned code:
         print("📋 Session Complete!")
         print(f"{'='*60}\n")
         
-        # Count statistics
-        cleaned = [log for log in self.session_log if log['status'] == 'cleaned']
-        analyzed = [log for log in self.session_log if log['status'] == 'analyzed']
-        skipped = [log for log in self.session_log if log['status'] == 'skipped']
+        # Count statistics in one pass over the log
+        session_log = self._read_log()
+        by_status = {'cleaned': [], 'analyzed': [], 'skipped': [], 'clean': []}
+        calls = []
+        for log in session_log:
+            by_status.setdefault(log['status'], []).append(log)
+            calls.extend(log.get('calls', []))
+        cleaned = by_status['cleaned']
+        analyzed = by_status['analyzed']
+        skipped = by_status['skipped']
+        already_clean = by_status['clean']
         
         print(f"✅ Files cleaned: {len(cleaned)}")
         print(f"🔍 Files analyzed only: {len(analyzed)}")
         print(f"⏭️ Files skipped: {len(skipped)}")
+        print(f"✨ Files already clean: {len(already_clean)}")
         
         if cleaned:
             total_lines = sum(log.get('lines_changed', 0) for log in cleaned)
             print(f"📈 Total lines changed: {total_lines:+d}")
         
-        # Save detailed report
-        report_dir = Path(".cleanup-toolkit/reports")
-        report_dir.mkdir(parents=True, exist_ok=True)
+        cache_hits = sum(1 for call in calls if call['cache_hit'])
+        if calls:
+            print(f"💾 Cache hits: {cache_hits}/{len(calls)}")
         
-        report_path = report_dir / "codex-session.json"
+        # Save detailed report
+        report_path = REPORT_DIR / "codex-session.json"
         with open(report_path, 'w') as f:
-            json.dump(self.session_log, f, indent=2)
+            json.dump(session_log, f, indent=2)
         
         print(f"\n📄 Detailed report saved: {report_path}")
         
         # Generate markdown report
-        md_report_path = report_dir / "codex-session.md"
+        md_report_path = REPORT_DIR / "codex-session.md"
         with open(md_report_path, 'w') as f:
             f.write("# Codex Cleanup Session Report\n\n")
-            f.write(f"**Total files processed:** {len(self.session_log)}\n")
+            f.write(f"**Total files processed:** {len(session_log)}\n")
             f.write(f"**Files cleaned:** {len(cleaned)}\n")
             f.write(f"**Files analyzed:** {len(analyzed)}\n")
-            f.write(f"**Files skipped:** {len(skipped)}\n\n")
+            f.write(f"**Files skipped:** {len(skipped)}\n")
+            f.write(f"**Files already clean:** {len(already_clean)}\n")
+            if calls:
+                f.write(f"**Cache hit rate:** {cache_hits}/{len(calls)} "
+                        f"({cache_hits / len(calls):.0%})\n")
+            f.write("\n")
             
             if cleaned:
                 f.write("## Cleaned Files\n\n")
@@ -305,21 +708,32 @@ Cleaned code:
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: interactive-cleanup.py <file1> [file2] ...")
+        print("Usage: interactive-cleanup.py [--no-cache] <file1> [file2] ...")
+        print("       interactive-cleanup.py --resume-batch <batch_id>")
         print("\nExample:")
         print("  interactive-cleanup.py src/*.py")
         print("  interactive-cleanup.py main.js utils.js")
         sys.exit(1)
     
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    files = [arg for arg in args if arg != "--no-cache"]
+    
+    cleanup = None
     try:
-        cleanup = InteractiveCleanup()
-        cleanup.start_session(sys.argv[1:])
+        cleanup = InteractiveCleanup(use_cache=use_cache)
+        if files[:1] == ["--resume-batch"] and len(files) == 2:
+            sys.exit(0 if asyncio.run(cleanup.resume_batch(files[1])) else 1)
+        asyncio.run(cleanup.start_session(files))
     except ValueError as e:
         print(f"Error: {e}")
         print("Set OPENAI_API_KEY environment variable")
         sys.exit(1)
     except KeyboardInterrupt:
         print("\n\n⚠️ Session interrupted by user")
+        if cleanup is not None:
+            # Everything logged so far is already on disk
+            cleanup.generate_session_report()
         sys.exit(0)
 
 if __name__ == "__main__":
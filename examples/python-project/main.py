@@ -2,11 +2,13 @@
 # Example messy Python file for demonstration
 
 import os
+import re
 import sys
 import json
 import requests
 import time
 import datetime
+import itertools
 from typing import List, Dict, Any, Optional
 import pandas as pd  # Unused import
 import numpy as np   # Unused import
@@ -15,10 +17,14 @@ import numpy as np   # Unused import
 DEBUG = True
 TEMP_DATA = []
 
+# Compiled once at import instead of on every validation
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class UserManager:
     def __init__(self):
         self.users = []
-        self.temp_users = []  # FIXME: Remove this
+        self._by_id = {}  # id -> user, so lookups don't scan the list
+        self._next_id = 1
         
     def add_user(self, name, email, age=None):
         # Debug print
@@ -33,56 +39,48 @@ class UserManager:
             'name': name,
             'email': email,
             'age': age,
-            'created_at': datetime.datetime.now(),
-            'id': len(self.users) + 1
+            'created_at_ns': time.time_ns(),  # Formatted only when shown, see iso_ts()
+            'id': self._next_id
         }
+        self._next_id += 1
         
         # Add to list
         self.users.append(user)
-        
-        # Also add to temp list for some reason
-        self.temp_users.append(user)
+        self._by_id[user['id']] = user
         
         print(f"User added successfully: {user}")  # More debug
         return True
         
+    def add_users(self, records):
+        """Add many users at once; records without a name are skipped."""
+        counter = itertools.count(self._next_id)
+        created_at_ns = time.time_ns()
+        new = [{**record, 'id': next(counter), 'created_at_ns': created_at_ns}
+               for record in records if record.get('name')]
+        self.users.extend(new)
+        self._by_id.update((user['id'], user) for user in new)
+        self._next_id += len(new)
+        return len(new)
+        
     def get_user(self, user_id):
         print(f"Getting user with ID: {user_id}")  # Debug
-        for user in self.users:
-            if user['id'] == user_id:
-                return user
-        return None
+        return self._by_id.get(user_id)
         
     def delete_user(self, user_id):
         # Find and remove user
-        for i, user in enumerate(self.users):
-            if user['id'] == user_id:
-                print(f"Deleting user: {user}")
-                del self.users[i]
-                return True
-        return False
-        
-    # Duplicate method - should consolidate
-    def remove_user(self, user_id):
-        for i, user in enumerate(self.users):
-            if user['id'] == user_id:
-                print(f"Removing user: {user}")
-                del self.users[i]
-                return True
-        return False
-
-# Utility functions that could be consolidated
-def validate_email(email):
-    # Basic email validation
-    if '@' in email and '.' in email:
+        user = self._by_id.pop(user_id, None)
+        if user is None:
+            return False
+        print(f"Deleting user: {user}")
+        self.users.remove(user)
         return True
-    return False
 
-def validate_email_address(email):
-    # Another email validation function - duplicate!
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+def iso_ts(ns):
+    """Format a time.time_ns() timestamp as an ISO 8601 string."""
+    return datetime.datetime.fromtimestamp(ns / 1e9).isoformat()
+
+def validate_email(email):
+    return _EMAIL_RE.match(email) is not None
 
 # Main function with lots of issues
 def main():
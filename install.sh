@@ -90,7 +90,8 @@ install_precommit_hook() {
     local hooks_dir=".git/hooks"
     local toolkit_dir=".cleanup-toolkit"
     
-    # Copy the pre-commit hook
+    # Copy the pre-commit hook; repositories made with an empty --template= have no hooks dir
+    mkdir -p "$hooks_dir"
     cp "$(dirname "$0")/hooks/pre-commit" "$hooks_dir/pre-commit"
     chmod +x "$hooks_dir/pre-commit"
     
@@ -409,21 +410,33 @@ display_summary() {
     echo ""
 }
 
+# Ask a y/N question; with CLEANUP_TOOLKIT_NONINTERACTIVE=1 answer it from
+# CLEANUP_TOOLKIT_DEFAULTS (yes/no) instead of reading stdin
+ask_yes_no() {
+    local reply=""
+    if [ "${CLEANUP_TOOLKIT_NONINTERACTIVE:-}" = "1" ]; then
+        if [ "${CLEANUP_TOOLKIT_DEFAULTS:-no}" = "yes" ]; then
+            reply="y"
+        fi
+    else
+        read -p "$1" reply
+    fi
+    [[ $reply =~ ^[Yy]$ ]]
+}
+
 # Interactive setup
 interactive_setup() {
     echo -e "${BLUE}Would you like to enable additional integrations?${NC}"
     echo ""
     
     # Claude Code
-    read -p "Enable Claude Code integration? (y/N): " enable_claude
-    if [[ $enable_claude =~ ^[Yy]$ ]]; then
+    if ask_yes_no "Enable Claude Code integration? (y/N): "; then
         sed -i 's/claude_code_enabled: false/claude_code_enabled: true/' .cleanup-toolkit/config.yml
         print_step "Claude Code integration enabled"
     fi
     
     # Warp Terminal
-    read -p "Enable Warp Terminal integration? (y/N): " enable_warp
-    if [[ $enable_warp =~ ^[Yy]$ ]]; then
+    if ask_yes_no "Enable Warp Terminal integration? (y/N): "; then
         sed -i 's/warp_terminal_enabled: false/warp_terminal_enabled: true/' .cleanup-toolkit/config.yml
         print_step "Warp Terminal integration enabled"
     fi
@@ -470,6 +483,10 @@ case "${1:-}" in
         echo "  --version, -v  Show version information"
         echo "  --uninstall    Remove the toolkit"
         echo ""
+        echo "Environment:"
+        echo "  CLEANUP_TOOLKIT_NONINTERACTIVE=1  Skip the prompts"
+        echo "  CLEANUP_TOOLKIT_DEFAULTS=yes|no   Answer for skipped prompts (default: no)"
+        echo ""
         exit 0
         ;;
     --version|-v)
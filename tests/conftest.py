@@ -54,38 +54,95 @@ def pytest_configure(config):
     )
 
 
+# Suite marker for each test directory name
+_MARKER_BY_DIR = {
+    "unit": pytest.mark.unit,
+    "integration": pytest.mark.integration,
+    "e2e": pytest.mark.e2e,
+    "performance": pytest.mark.performance,
+    "security": pytest.mark.security,
+}
+
+
 def pytest_collection_modifyitems(config, items):
     """Automatically add markers based on test location."""
     for item in items:
-        # Add markers based on test file location
-        if "unit" in str(item.fspath):
-            item.add_marker(pytest.mark.unit)
-        elif "integration" in str(item.fspath):
-            item.add_marker(pytest.mark.integration)
-        elif "e2e" in str(item.fspath):
-            item.add_marker(pytest.mark.e2e)
-        elif "performance" in str(item.fspath):
-            item.add_marker(pytest.mark.performance)
-        elif "security" in str(item.fspath):
-            item.add_marker(pytest.mark.security)
+        # Add markers based on test file location, nearest directory first
+        for part in reversed(item.path.parts):
+            marker = _MARKER_BY_DIR.get(part)
+            if marker is not None:
+                item.add_marker(marker)
+                break
 
 
 # ==================== Basic Fixtures ====================
 
+def _remove_tree(path: Path) -> None:
+    """Delete a directory tree, using rm -rf where available."""
+    # rm recurses in C with one fork; shutil.rmtree pays Python overhead per entry
+    if os.name == "posix" and shutil.which("rm"):
+        if subprocess.run(["rm", "-rf", str(path)]).returncode == 0:
+            return
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def _tmp_root() -> Generator[Path, None, None]:
+    """Create one temporary root per session (per xdist worker)."""
+    root = Path(tempfile.mkdtemp(prefix="cleanup_toolkit_test_"))
+    yield root
+    # One recursive delete at session end instead of one per test
+    _remove_tree(root)
+
+
 @pytest.fixture
-def temp_dir() -> Generator[Path, None, None]:
+def temp_dir(_tmp_root: Path, request) -> Path:
     """Create a temporary directory for testing."""
-    temp_path = Path(tempfile.mkdtemp(prefix="cleanup_toolkit_test_"))
-    yield temp_path
-    # Cleanup
-    if temp_path.exists():
-        shutil.rmtree(temp_path)
+    # Names repeat across test classes, so mkdtemp keeps each directory unique
+    prefix = "".join(c if c.isalnum() else "_" for c in request.node.name[:40])
+    return Path(tempfile.mkdtemp(prefix=f"{prefix}_", dir=_tmp_root))
+
+
+@pytest.fixture(scope="session")
+def _git_template(_tmp_root: Path) -> Path:
+    """Build a committed git repository once for temp_git_repo to copy."""
+    template = _tmp_root / "git_template"
+    template.mkdir()
+    commands = [
+        ["git", "init", "-q"],
+        ["git", "symbolic-ref", "HEAD", "refs/heads/main"],
+        ["git", "config", "user.name", "Test User"],
+        ["git", "config", "user.email", "test@example.com"],
+        ["git", "config", "commit.gpgsign", "false"],
+    ]
+    for cmd in commands:
+        subprocess.run(cmd, cwd=template, check=True)
+    (template / "README.md").write_text("# Test Repository\n")
+    subprocess.run(["git", "add", "README.md"], cwd=template, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "Initial commit"], cwd=template, check=True)
+    return template
 
 
 @pytest.fixture
-def sample_python_file(temp_dir: Path) -> Path:
-    """Create a sample messy Python file for testing."""
-    file_path = temp_dir / "messy_code.py"
+def temp_git_repo(temp_dir: Path, _git_template: Path):
+    """Copy the template repository into temp_dir and open it with GitPython."""
+    git = pytest.importorskip("git")
+    shutil.copytree(_git_template, temp_dir, dirs_exist_ok=True)
+    return git.Repo(temp_dir)
+
+
+@pytest.fixture(scope="session")
+def _samples_dir(_tmp_root: Path) -> Path:
+    """Directory holding the session-scoped sample files."""
+    samples = _tmp_root / "samples"
+    samples.mkdir()
+    return samples
+
+
+@pytest.fixture(scope="session")
+def sample_python_file(_samples_dir: Path) -> Path:
+    """Create a sample messy Python file for testing (shared, treat as read-only)."""
+    file_path = _samples_dir / "messy_code.py"
     content = '''#!/usr/bin/env python3
 import os
 import sys
@@ -121,41 +178,6 @@ if __name__ == "__main__":
     return file_path
 
 
-@pytest.fixture
-def sample_javascript_file(temp_dir: Path) -> Path:
-    """Create a sample messy JavaScript file for testing."""
-    file_path = temp_dir / "messy_code.js"
-    content = '''
-const fs = require('fs');
-const path = require('path');
-const unused = require('lodash');  // unused
-
-function calculateSum(a, b) {
-    console.log(`Debug: calculating ${a} + ${b}`);  // debug statement
-    const result = a + b;
-    console.log(`Debug: result is ${result}`);  // debug statement
-    return result;
-}
-
-function calcSum(x, y) {  // duplicate function
-    return x + y;
-}
-
-// TODO: Fix this later
-// FIXME: This is broken
-function brokenFunction() {
-    
-}
-
-if (require.main === module) {
-    console.log("Running main");  // debug
-    const result = calculateSum(1, 2);
-}
-'''
-    file_path.write_text(content)
-    return file_path
-
-
 @pytest.fixture
 def mock_subprocess():
     """Mock subprocess for testing."""
@@ -166,54 +188,12 @@ def mock_subprocess():
     return mock_result
 
 
-@pytest.fixture
-def mock_git_repo(temp_dir: Path):
-    """Mock git repository without requiring GitPython."""
-    # Create basic git structure
-    git_dir = temp_dir / ".git"
-    git_dir.mkdir()
-    
-    # Create hooks directory
-    hooks_dir = git_dir / "hooks"
-    hooks_dir.mkdir()
-    
-    # Create config file
-    config_file = git_dir / "config"
-    config_content = """[core]
-    repositoryformatversion = 0
-    filemode = true
-    bare = false
-    logallrefupdates = true
-[user]
-    name = Test User
-    email = test@example.com
-"""
-    config_file.write_text(config_content)
-    
-    return {
-        "path": temp_dir,
-        "git_dir": git_dir,
-        "hooks_dir": hooks_dir
-    }
-
-
 @pytest.fixture
 def project_root():
     """Get the project root directory."""
     return PROJECT_ROOT
 
 
-@pytest.fixture
-def cleanup_toolkit_files():
-    """Get paths to cleanup toolkit files."""
-    return {
-        "pre_commit_hook": PROJECT_ROOT / "hooks" / "pre-commit",
-        "install_script": PROJECT_ROOT / "install.sh",
-        "cleanup_script": PROJECT_ROOT / "scripts" / "code_cleanup_gist.sh",
-        "test_runner": PROJECT_ROOT / "run_tests.py"
-    }
-
-
 # ==================== Test Utilities ====================
 
 def create_test_files(directory: Path, file_specs: dict) -> dict:
@@ -246,10 +226,15 @@ def count_patterns(text: str, patterns: list) -> int:
 def simulate_git_add(repo_path: Path, files: list) -> bool:
     """Simulate git add operation."""
     try:
+        # List each parent directory once instead of stat-ing every file
+        names_by_parent = {}
         for file in files:
             file_path = repo_path / file if isinstance(file, str) else file
-            if not file_path.exists():
-                return False
+            names_by_parent.setdefault(file_path.parent, set()).add(file_path.name)
+        for parent, names in names_by_parent.items():
+            with os.scandir(parent) as entries:
+                if not names <= {entry.name for entry in entries}:
+                    return False
         return True
     except Exception:
         return False
@@ -21,6 +21,53 @@ import pytest
 import git
 from git import Repo
 
+HOOK_SRC = Path(__file__).parent.parent.parent / "hooks" / "pre-commit"
+
+
+@pytest.fixture(scope="session")
+def precommit_bytes():
+    """Read the pre-commit hook once per session, or None if it is missing."""
+    return HOOK_SRC.read_bytes() if HOOK_SRC.exists() else None
+
+
+def _link_or_copy_executable(source: Path, target: Path) -> None:
+    """Hard-link target to source, or copy it without metadata and mark it executable."""
+    try:
+        # A link shares the source's inode and mode, so there is nothing to chmod
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+        os.chmod(target, 0o755)
+
+
+@pytest.fixture(scope="session")
+def golden_repo(tmp_path_factory) -> Path:
+    """Build a repository with the initial README commit once per session."""
+    golden = tmp_path_factory.mktemp("golden")
+    (golden / "README.md").write_text("# Test Project\n")
+    commands = [
+        ["git", "init", "-q", "--initial-branch=main"],
+        ["git", "add", "README.md"],
+        ["git", "-c", "user.name=Test User", "-c", "user.email=test@example.com",
+         "commit", "-q", "-m", "Initial commit"],
+    ]
+    for cmd in commands:
+        subprocess.run(cmd, cwd=golden, check=True)
+    return golden
+
+
+def _install_hook(hooks_dir: Path, data) -> None:
+    """Write the hook bytes into hooks_dir as an executable pre-commit hook."""
+    if data is None:
+        return
+    hooks_dir.mkdir(exist_ok=True)
+    # Created with the exec bit, so no copy-then-chmod round trip
+    fd = os.open(hooks_dir / "pre-commit", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
 
 @pytest.mark.integration
 @pytest.mark.requires_git
@@ -28,21 +75,19 @@ class TestGitWorkflowIntegration:
     """Test git workflow integration with cleanup toolkit."""
     
     @pytest.fixture(autouse=True)
-    def setup(self, temp_dir):
+    def setup(self, temp_dir, precommit_bytes, golden_repo):
         """Set up test environment with git repo."""
         self.temp_dir = temp_dir
-        self.repo = git.Repo.init(temp_dir)
-        
-        # Configure git
-        with self.repo.config_writer() as config:
-            config.set_value("user", "name", "Test User")
-            config.set_value("user", "email", "test@example.com")
-        
-        # Create initial commit
-        readme = temp_dir / "README.md"
-        readme.write_text("# Test Project\n")
-        self.repo.index.add([str(readme)])
-        self.repo.index.commit("Initial commit")
+        self.precommit_bytes = precommit_bytes
+        
+        # Clone the initial commit, borrowing its objects, and configure git
+        subprocess.run(
+            ["git", "clone", "-q", "--local", "--shared",
+             "-c", "user.name=Test User", "-c", "user.email=test@example.com",
+             str(golden_repo), str(temp_dir)],
+            check=True
+        )
+        self.repo = git.Repo(temp_dir)
         
         # Install cleanup toolkit
         self.install_cleanup_toolkit()
@@ -53,14 +98,8 @@ class TestGitWorkflowIntegration:
         toolkit_dir = self.temp_dir / ".cleanup-toolkit"
         toolkit_dir.mkdir(exist_ok=True)
         
-        # Copy hooks
-        hooks_src = Path(__file__).parent.parent.parent / "hooks"
-        hooks_dst = self.temp_dir / ".git" / "hooks"
-        hooks_dst.mkdir(exist_ok=True)
-        
-        if (hooks_src / "pre-commit").exists():
-            shutil.copy2(hooks_src / "pre-commit", hooks_dst / "pre-commit")
-            os.chmod(hooks_dst / "pre-commit", 0o755)
+        # Install hook
+        _install_hook(self.temp_dir / ".git" / "hooks", self.precommit_bytes)
         
         # Copy scripts
         scripts_src = Path(__file__).parent.parent.parent / "scripts"
@@ -68,11 +107,10 @@ class TestGitWorkflowIntegration:
         scripts_dst.mkdir(exist_ok=True)
         
         if (scripts_src / "code_cleanup_gist.sh").exists():
-            shutil.copy2(
+            _link_or_copy_executable(
                 scripts_src / "code_cleanup_gist.sh",
                 scripts_dst / "code_cleanup_gist.sh"
             )
-            os.chmod(scripts_dst / "code_cleanup_gist.sh", 0o755)
     
     def test_complete_commit_workflow(self):
         """Test complete commit workflow with cleanup."""
@@ -296,7 +334,7 @@ commands:
         
         return temp_dir
     
-    def test_claude_integration(self, setup_claude_project, temp_git_repo):
+    def test_claude_integration(self, setup_claude_project, temp_git_repo, precommit_bytes):
         """Test Claude Code integration."""
         temp_dir = setup_claude_project
         
@@ -311,12 +349,7 @@ def test():
         temp_git_repo.index.add([str(test_file)])
         
         # Install pre-commit hook
-        hooks_dir = temp_dir / ".git" / "hooks"
-        hooks_dir.mkdir(exist_ok=True)
-        hook_src = Path(__file__).parent.parent.parent / "hooks" / "pre-commit"
-        if hook_src.exists():
-            shutil.copy2(hook_src, hooks_dir / "pre-commit")
-            os.chmod(hooks_dir / "pre-commit", 0o755)
+        _install_hook(temp_dir / ".git" / "hooks", precommit_bytes)
         
         # Try commit
         try:
@@ -338,7 +371,7 @@ def test():
             # Should have cleanup request added
             assert "cleanup" in content.lower() or len(content) > 100
     
-    def test_warp_integration(self, setup_warp_project, temp_git_repo):
+    def test_warp_integration(self, setup_warp_project, temp_git_repo, precommit_bytes):
         """Test Warp Terminal integration."""
         temp_dir = setup_warp_project
         
@@ -354,12 +387,7 @@ function app() {
         temp_git_repo.index.add([str(test_file)])
         
         # Install pre-commit hook
-        hooks_dir = temp_dir / ".git" / "hooks"
-        hooks_dir.mkdir(exist_ok=True)
-        hook_src = Path(__file__).parent.parent.parent / "hooks" / "pre-commit"
-        if hook_src.exists():
-            shutil.copy2(hook_src, hooks_dir / "pre-commit")
-            os.chmod(hooks_dir / "pre-commit", 0o755)
+        _install_hook(temp_dir / ".git" / "hooks", precommit_bytes)
         
         # Try commit
         try:
@@ -496,19 +524,15 @@ public class App {
         
         return [py_file, js_file, go_file, java_file]
     
-    def test_multi_language_detection(self, multi_language_project, temp_git_repo, temp_dir):
+    def test_multi_language_detection(self, multi_language_project, temp_git_repo, temp_dir,
+                                      precommit_bytes):
         """Test detection of issues across multiple languages."""
         # Stage all files
         for file_path in multi_language_project:
             temp_git_repo.index.add([str(file_path)])
         
         # Install pre-commit hook
-        hooks_dir = temp_dir / ".git" / "hooks"
-        hooks_dir.mkdir(exist_ok=True)
-        hook_src = Path(__file__).parent.parent.parent / "hooks" / "pre-commit"
-        if hook_src.exists():
-            shutil.copy2(hook_src, hooks_dir / "pre-commit")
-            os.chmod(hooks_dir / "pre-commit", 0o755)
+        _install_hook(temp_dir / ".git" / "hooks", precommit_bytes)
         
         # Try commit
         try:
@@ -0,0 +1,102 @@
+"""
+Opt-in fixtures with sample data for Cleanup Toolkit tests.
+
+These fixtures are used by few tests, so they are kept out of conftest.py.
+Load them from a test module with::
+
+    pytest_plugins = ["tests.plugins.cleanup_data"]
+
+or for a whole run with ``pytest -p tests.plugins.cleanup_data``.
+"""
+
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+# ==================== Sample Data Fixtures ====================
+
+@pytest.fixture(scope="session")
+def sample_javascript_file(_samples_dir: Path) -> Path:
+    """Create a sample messy JavaScript file for testing (shared, treat as read-only)."""
+    file_path = _samples_dir / "messy_code.js"
+    content = '''
+const fs = require('fs');
+const path = require('path');
+const unused = require('lodash');  // unused
+
+function calculateSum(a, b) {
+    console.log(`Debug: calculating ${a} + ${b}`);  // debug statement
+    const result = a + b;
+    console.log(`Debug: result is ${result}`);  // debug statement
+    return result;
+}
+
+function calcSum(x, y) {  // duplicate function
+    return x + y;
+}
+
+// TODO: Fix this later
+// FIXME: This is broken
+function brokenFunction() {
+    
+}
+
+if (require.main === module) {
+    console.log("Running main");  // debug
+    const result = calculateSum(1, 2);
+}
+'''
+    file_path.write_text(content)
+    return file_path
+
+
+@pytest.fixture
+def mock_git_repo(temp_dir: Path):
+    """Mock git repository without requiring GitPython."""
+    # Create basic git structure
+    git_dir = temp_dir / ".git"
+    git_dir.mkdir()
+    
+    # Create hooks directory
+    hooks_dir = git_dir / "hooks"
+    hooks_dir.mkdir()
+    
+    # Create config file
+    config_file = git_dir / "config"
+    config_content = """[core]
+    repositoryformatversion = 0
+    filemode = true
+    bare = false
+    logallrefupdates = true
+[user]
+    name = Test User
+    email = test@example.com
+"""
+    config_file.write_text(config_content)
+    
+    return {
+        "path": temp_dir,
+        "git_dir": git_dir,
+        "hooks_dir": hooks_dir
+    }
+
+
+@pytest.fixture(scope="session")
+def fake():
+    """Shared Faker instance, imported only by tests that request it."""
+    faker = pytest.importorskip("faker")
+    return faker.Faker()
+
+
+@pytest.fixture(scope="session")
+def cleanup_toolkit_files():
+    """Get paths to cleanup toolkit files."""
+    return {
+        "pre_commit_hook": PROJECT_ROOT / "hooks" / "pre-commit",
+        "install_script": PROJECT_ROOT / "install.sh",
+        "cleanup_script": PROJECT_ROOT / "scripts" / "code_cleanup_gist.sh",
+        "test_runner": PROJECT_ROOT / "run_tests.py"
+    }
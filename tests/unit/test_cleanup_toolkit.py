@@ -2,15 +2,19 @@
 Tests for the cleanup_toolkit Python package.
 """
 
+import json
+import os
+import subprocess
 import pytest
 from pathlib import Path
 import tempfile
 
 # Import the package modules
 from cleanup_toolkit import __version__, CleanupEngine, CleanupConfig, CodeAnalyzer, PatternMatcher, CleanupCommand
-from cleanup_toolkit.core import CleanupConfig, CleanupEngine
+from cleanup_toolkit.core import CleanupConfig, CleanupEngine, detect_language
 from cleanup_toolkit.analyzers import CodeAnalyzer, PatternMatcher
 from cleanup_toolkit.commands import CleanupCommand
+from cleanup_toolkit import _fast_scan
 
 
 class TestCleanupConfig:
@@ -31,6 +35,17 @@ class TestCleanupConfig:
         assert loaded["auto_fix"] is False
         assert "exclude_patterns" in loaded
         assert "debug_patterns" in loaded
+        assert loaded["debug_patterns"] == PatternMatcher().patterns["debug"]
+    
+    def test_debug_patterns_assignable(self):
+        """Test that debug patterns can be replaced and edited in place."""
+        config = CleanupConfig()
+        config.debug_patterns["python"].append(r"logging\.debug")
+        assert r"logging\.debug" in config.load()["debug_patterns"]["python"]
+        
+        config.debug_patterns = {"python": [r"print\s*\("]}
+        assert config.load()["debug_patterns"] == {"python": [r"print\s*\("]}
+        assert r"logging\.debug" not in PatternMatcher().patterns["debug"]["python"]
     
     def test_is_excluded(self):
         """Test file exclusion logic."""
@@ -39,6 +54,36 @@ class TestCleanupConfig:
         assert config.is_excluded("vendor/package.py") is True
         assert config.is_excluded("src/main.py") is False
         assert config.is_excluded(".git/config") is True
+    
+    def test_is_excluded_globs(self):
+        """Test that exclude patterns are matched as globs, not substrings."""
+        config = CleanupConfig()
+        assert config.is_excluded("static/app.min.js") is True
+        assert config.is_excluded("static/app.min.jsx") is False
+        assert config.is_excluded("src\\node_modules\\pkg\\index.js") is True
+        
+        config.exclude_patterns.append("build/generated/")
+        assert config.is_excluded("build/generated/out.py") is True
+        assert config.is_excluded("src/build/generated/out.py") is True
+        assert config.is_excluded("build/out.py") is False
+
+
+class TestLanguageDetection:
+    """Test the shared extension-to-language lookup."""
+    
+    def test_detect_language(self):
+        """Test language detection matches Path.suffix semantics."""
+        assert detect_language("src/App.TSX") == "javascript"
+        assert detect_language("pkg\\main.go") == "go"
+        assert detect_language("lib.v2/README") == "unknown"
+        assert detect_language("src/.py") == "unknown"
+        assert detect_language("Makefile") == "unknown"
+    
+    def test_matches_language(self):
+        """Test the command's language filter uses the shared map."""
+        command = CleanupCommand()
+        assert command._matches_language("a/b.jsx", "JavaScript") is True
+        assert command._matches_language("a/b.py", "go") is False
 
 
 class TestCleanupEngine:
@@ -70,6 +115,29 @@ def main():
         assert len(result["issues"]) > 0
         assert engine.stats["files_processed"] == 1
     
+    def test_analyze_file_uses_configured_debug_patterns(self, tmp_path):
+        """Test that config.debug_patterns replace the default debug patterns."""
+        test_file = tmp_path / "app.py"
+        test_file.write_text("logger.debug('x')\nprint('y')\n")
+        
+        config = CleanupConfig()
+        config.debug_patterns = {"python": [r"logger\.debug"]}
+        result = CleanupEngine(config).analyze_file(str(test_file))
+        assert [(i.line, i.pattern) for i in result["issues"]] == [(1, r"logger\.debug")]
+        
+        details = CleanupCommand(config).run(files=[str(test_file)])["details"]
+        assert [i["line"] for i in details[0]["issues"]] == [1]
+    
+    def test_analyze_file_ignores_todo_named_fields(self, tmp_path):
+        """Test that fields named note/todo do not count as TODO comments."""
+        test_file = tmp_path / "model.py"
+        test_file.write_text("class Task:\n    note: str\n    todo: list\n")
+        
+        engine = CleanupEngine()
+        engine.analyze_file(str(test_file))
+        
+        assert engine.stats["todos"] == 0
+    
     def test_analyze_excluded_file(self):
         """Test analyzing an excluded file."""
         engine = CleanupEngine()
@@ -77,6 +145,16 @@ def main():
         assert result["skipped"] is True
         assert result["reason"] == "excluded"
     
+    def test_analyze_skips_unsupported_and_binary_files(self, tmp_path):
+        """Test that unknown and binary files are skipped before scanning."""
+        (tmp_path / "notes.txt").write_text("TODO: something")
+        (tmp_path / "blob.py").write_bytes(b"print(1)\0\x01\x02")
+        
+        engine = CleanupEngine()
+        assert engine.analyze_file(str(tmp_path / "notes.txt"))["reason"] == "unsupported"
+        assert engine.analyze_file(str(tmp_path / "blob.py"))["reason"] == "binary"
+        assert engine.stats["files_processed"] == 0
+    
     def test_analyze_directory(self, tmp_path):
         """Test analyzing a directory."""
         # Create test files
@@ -87,6 +165,20 @@ def main():
         results = engine.analyze_directory(str(tmp_path))
         assert len(results) == 2
     
+    def test_analyze_directory_parallel(self, tmp_path):
+        """Test that pooled directory analysis matches serial analysis."""
+        for i in range(40):
+            (tmp_path / f"mod{i}.py").write_text("print('x')\n# TODO: y\n")
+        
+        config = CleanupConfig()
+        config.max_workers = 2
+        engine = CleanupEngine(config)
+        results = engine.analyze_directory(str(tmp_path))
+        assert len(results) == 40
+        assert engine.stats["files_processed"] == 40
+        assert engine.stats["debug_statements"] == 40
+        assert engine.stats["todos"] == 40
+    
     def test_cleanup_file(self, tmp_path):
         """Test cleanup file method."""
         test_file = tmp_path / "test.py"
@@ -124,7 +216,7 @@ console.log("Test")
 """
         matches = matcher.find_patterns(content, "debug", "python")
         assert len(matches) > 0
-        assert any(m["type"] == "debug" for m in matches)
+        assert any(m.type == "debug" for m in matches)
     
     def test_find_todo_patterns(self):
         """Test finding TODO patterns."""
@@ -136,11 +228,95 @@ console.log("Test")
         matches = matcher.find_patterns(content, "todo")
         assert len(matches) == 2
     
+    def test_todo_pattern_needs_whole_marker(self):
+        """Test the TODO pattern across comment styles and word boundaries."""
+        matcher = PatternMatcher()
+        content = "/* HACK: a */\nx = 1  # note: b\n# MYTODO: c\nTODO d\n// FIXME: e\n"
+        assert [m.line for m in matcher.find_patterns(content, "todo")] == [1, 2, 5]
+    
+    def test_todo_pattern_ignores_identifiers(self):
+        """Test that code named note/todo is not flagged without a comment."""
+        matcher = PatternMatcher()
+        content = "    note: str\n    todo: list\nconst o = {todo: [], xxx: 1};\n"
+        assert matcher.find_patterns(content, "todo") == []
+    
+    def test_patterns_stay_within_a_line(self):
+        """Test that whole-buffer scans don't join a marker split across lines."""
+        matcher = PatternMatcher()
+        assert matcher.find_patterns("x = 1  #\nTODO: later\n", "todo") == []
+        assert matcher.find_patterns("import\npdb\nprint\n(x)\n", "debug", "python") == []
+    
+    def test_find_patterns_reports_lines_and_patterns(self):
+        """Test that fused patterns map back to their line and source pattern."""
+        matcher = PatternMatcher()
+        content = "x = 1\nimport pdb; pdb.set_trace()\nprint(x); print(x)\n"
+        matches = matcher.find_patterns(content, "debug", "python")
+        found = sorted((m.line, m.pattern) for m in matches)
+        assert found == [
+            (2, r"import[ \t]+pdb"),
+            (2, r"pdb\.set_trace"),
+            (3, r"print[ \t]*\("),
+        ]
+        assert matches[0].content == "import pdb; pdb.set_trace()"
+        assert matches[0].to_dict() == {
+            "line": 2,
+            "content": "import pdb; pdb.set_trace()",
+            "pattern": matches[0].pattern,
+            "type": "debug",
+        }
+    
+    def test_overlapping_patterns_are_all_reported(self, monkeypatch):
+        """Test that a pattern overlapping another's match on the line is still found."""
+        monkeypatch.setattr(_fast_scan, "available", lambda: False)
+        matcher = PatternMatcher()
+        matches = matcher.find_patterns("import ipdb; ipdb.set_trace()\n", "debug", "python")
+        assert sorted(m.pattern for m in matches) == sorted([
+            r"import[ \t]+ipdb", r"ipdb\.set_trace", r"pdb\.set_trace",
+        ])
+        assert {m.line for m in matches} == {1}
+    
+    def test_literal_patterns_are_detected(self):
+        """Test splitting escaped literals from real regexes."""
+        assert _fast_scan.literal_of(r"fmt\.Print") == "fmt.Print"
+        assert _fast_scan.literal_of(r"println\(") == "println("
+        assert _fast_scan.literal_of(r"print\s*\(") is None
+        assert _fast_scan.literal_of(r"console\.(log|debug)") is None
+    
+    @pytest.mark.parametrize("backend", ["ahocorasick", "numba"])
+    def test_fast_scan_matches_regex_scan(self, backend, monkeypatch):
+        """Test that each accelerated literal scan agrees with the regex engine."""
+        pytest.importorskip(backend)
+        if backend == "numba":
+            _fast_scan._load_backends()
+            monkeypatch.setattr(_fast_scan, "_ahocorasick", None)
+        # Line 6 holds overlapping hits: fmt\.Print and println\( share "Print"
+        content = ("package main\n\nfunc main() {\n\tFMT.Printf(1)\n\tlog.Printf(\"%d\", 2)\n"
+                   "\tfmt.Println(3)\n}\n")
+        python = "import ipdb; ipdb.set_trace()\n"
+        fast = PatternMatcher().find_patterns(content, "debug", "go")
+        fast_python = PatternMatcher().find_patterns(python, "debug", "python")
+        monkeypatch.setattr(_fast_scan, "available", lambda: False)
+        slow = PatternMatcher().find_patterns(content, "debug", "go")
+        slow_python = PatternMatcher().find_patterns(python, "debug", "python")
+        assert [(m.line, m.pattern) for m in fast] == [(m.line, m.pattern) for m in slow]
+        assert [(m.line, m.pattern) for m in fast_python] == \
+            [(m.line, m.pattern) for m in slow_python]
+        assert [(m.line, m.pattern) for m in fast if m.line == 6] == \
+            [(6, r"fmt\.Print"), (6, r"println\(")]
+        assert len(fast_python) == 3
+    
     def test_add_custom_pattern(self):
         """Test adding custom patterns."""
         matcher = PatternMatcher()
         matcher.add_custom_pattern("custom", r"CUSTOM:", "python")
         assert "custom" in matcher.patterns
+    
+    def test_custom_debug_pattern_is_matched(self):
+        """Test that custom patterns are compiled and used by find_patterns."""
+        matcher = PatternMatcher()
+        matcher.add_custom_pattern("debug", r"logger\.debug\(", "python")
+        matches = matcher.find_patterns("logger.debug('x')\n", "debug", "python")
+        assert [m.pattern for m in matches] == [r"logger\.debug\("]
 
 
 class TestCodeAnalyzer:
@@ -170,6 +346,87 @@ def hello():
         assert "metrics" in result
         assert result["metrics"]["total_lines"] == 5
     
+    def test_line_metrics(self, tmp_path):
+        """Test line metrics with and without a trailing newline."""
+        analyzer = CodeAnalyzer()
+        test_file = tmp_path / "test.py"
+        for content in ("x = 1\n\n   \ny = 2", "x = 1\n\n   \ny = 2\n"):
+            test_file.write_text(content)
+            metrics = analyzer.analyze(str(test_file))["metrics"]
+            assert metrics["total_lines"] == 4
+            assert metrics["blank_lines"] == 2
+    
+    def test_large_files_are_scanned_via_mmap(self, tmp_path, monkeypatch):
+        """Test that mmap-backed scans match the in-memory text scan."""
+        import cleanup_toolkit.core as core
+        
+        test_file = tmp_path / "big.py"
+        body = "x = 1  # pad\n\n" * 20000
+        test_file.write_text(f"import pdb\n{body}print('é')\nimport ipdb; ipdb.set_trace()\n"
+                             "# TODO: trim\n")
+        assert test_file.stat().st_size > core.MMAP_THRESHOLD
+        
+        mapped = CodeAnalyzer().analyze(str(test_file))
+        mapped_engine = CleanupEngine().analyze_file(str(test_file))
+        monkeypatch.setattr(core, "MMAP_THRESHOLD", float("inf"))
+        in_memory = CodeAnalyzer().analyze(str(test_file))
+        in_memory_engine = CleanupEngine().analyze_file(str(test_file))
+        
+        assert mapped == in_memory
+        assert mapped_engine == in_memory_engine
+        assert mapped["metrics"]["total_lines"] == 40004
+        assert "print('é')" in [i.content for i in mapped["issues"]]
+        assert mapped["metrics"]["debug_statements"] == 5
+        assert mapped["python_analysis"]["unused_imports"] == ["pdb"]
+    
+    def test_analysis_cache(self, tmp_path, monkeypatch):
+        """Test that unchanged files are served from the result cache."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("print('x')\n")
+        cache_path = str(tmp_path / "cache" / "cache.sqlite")
+        
+        first = CodeAnalyzer(cache_path=cache_path).analyze(str(test_file))
+        
+        analyzer = CodeAnalyzer(cache_path=cache_path)
+        real_find = analyzer.pattern_matcher.find_patterns
+        monkeypatch.setattr(analyzer.pattern_matcher, "find_patterns",
+                            lambda *a, **k: pytest.fail("cache miss"))
+        assert analyzer.analyze(str(test_file)) == first
+        
+        monkeypatch.setattr(analyzer.pattern_matcher, "find_patterns", real_find)
+        test_file.write_text("print('x')\nprint('y')\n")
+        assert analyzer.analyze(str(test_file))["metrics"]["debug_statements"] == 2
+    
+    def test_analysis_cache_reports_callers_path(self, tmp_path, monkeypatch):
+        """Test that a cache hit reports the path as the caller spelled it."""
+        (tmp_path / "test.py").write_text("print('x')\n")
+        analyzer = CodeAnalyzer(cache_path=str(tmp_path / "cache.sqlite"))
+        assert analyzer.analyze(str(tmp_path / "test.py"))["file"] == str(tmp_path / "test.py")
+        
+        monkeypatch.chdir(tmp_path)
+        assert analyzer.analyze("test.py")["file"] == "test.py"
+    
+    def test_find_duplicates(self, tmp_path):
+        """Test finding exact duplicate files."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        (tmp_path / "c.py").write_text("x = 2\n")
+        
+        duplicates = CodeAnalyzer().find_duplicates(str(tmp_path))
+        assert len(duplicates) == 1
+        assert {Path(duplicates[0]["file1"]).name, Path(duplicates[0]["file2"]).name} == {"a.py", "b.py"}
+    
+    def test_comment_line_metrics(self, tmp_path):
+        """Test comment line counting for Python and JavaScript."""
+        analyzer = CodeAnalyzer()
+        py_file = tmp_path / "test.py"
+        py_file.write_text("# one\nx = 1  # trailing\n\t# two\n")
+        js_file = tmp_path / "test.js"
+        js_file.write_text("/**\n * doc\n */\n// note\nlet x = 1;\n")
+        
+        assert analyzer.analyze(str(py_file))["metrics"]["comment_lines"] == 2
+        assert analyzer.analyze(str(js_file))["metrics"]["comment_lines"] == 4
+    
     def test_find_unused_imports(self, tmp_path):
         """Test finding unused imports."""
         test_file = tmp_path / "test.py"
@@ -187,6 +444,22 @@ def main():
         assert "os" in unused
         assert "json" in unused
         assert "sys" not in unused
+    
+    def test_find_unused_imports_attribute_usage(self, tmp_path):
+        """Test that imports used through attribute chains count as used."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("""
+import os.path
+import json as j
+from collections import *
+from typing import List
+
+def join(parts: List[str]):
+    return os.path.join(*parts).upper()
+""")
+        
+        unused = CodeAnalyzer().find_unused_imports(str(test_file))
+        assert unused == ["j"]
 
 
 class TestCleanupCommand:
@@ -199,6 +472,149 @@ class TestCleanupCommand:
         assert command.engine is not None
         assert command.analyzer is not None
     
+    def test_run_parallel(self, tmp_path):
+        """Test running the command over enough files to use a process pool."""
+        files = []
+        for i in range(40):
+            path = tmp_path / f"mod{i}.py"
+            path.write_text("import os\nprint('x')\n")
+            files.append(str(path))
+        
+        config = CleanupConfig()
+        config.max_workers = 2
+        results = CleanupCommand(config).run(files=files, debug=True)
+        assert [d["file"] for d in results["details"]] == files
+        assert results["issues_found"] == 40
+    
+    def test_run_prefetch_keeps_order(self, tmp_path):
+        """Test that read-ahead keeps results in order and falls back per file."""
+        files = []
+        for i in range(50):
+            path = tmp_path / f"mod{i}.py"
+            path.write_text("print('x')\n" * (i % 3))
+            files.append(str(path))
+        (tmp_path / "mod7.py").write_bytes(b"\xff\xfe not utf-8")
+        files.append(str(tmp_path / "missing.py"))
+        
+        config = CleanupConfig()
+        config.max_workers = 1
+        details = CleanupCommand(config).run(files=files)["details"]
+        assert [d.get("file") for d in details[:-1]] == files[:-1]
+        assert [len(d["issues"]) for d in details[:7]] == [0, 1, 2, 0, 1, 2, 0]
+        assert "error" in details[7]
+        assert details[-1] == {"error": "File not found"}
+    
+    def test_run_summary_counts_analyzed_issues(self, tmp_path):
+        """Test that the summary reflects the issues the command reported."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("print('a')\nprint('b')\n# TODO: c\n")
+        
+        results = CleanupCommand().run(files=[str(test_file)])
+        summary = results["summary"]
+        assert summary["files_processed"] == 1
+        assert summary["debug_statements"] == 2
+        assert summary["todos"] == 1
+        assert summary["issues_found"] == results["issues_found"] == 3
+    
+    def test_run_reports_unused_imports(self, tmp_path):
+        """Test that unused imports come from the analyzer's single parse."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("import os\nimport sys\n\nsys.exit(0)\n")
+        
+        results = CleanupCommand().run(files=[str(test_file)], unused=True)
+        issues = results["details"][0]["issues"]
+        assert [i["content"] for i in issues] == ["Unused import: os"]
+    
+    def test_run_results_serialize_to_json(self, tmp_path):
+        """Test that run() results round-trip through JSON."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("import os\nprint('a')\n# TODO: b\n")
+        
+        results = CleanupCommand().run(files=[str(test_file)],
+                                       debug=True, todos=True, unused=True)
+        assert json.loads(json.dumps(results)) == results
+        types = sorted(i["type"] for i in results["details"][0]["issues"])
+        assert types == ["debug", "todo", "unused_import"]
+    
+    def test_run_failed_file_serializes_and_is_not_counted(self, tmp_path, monkeypatch):
+        """Test that a file failing after partial analysis stays serializable and uncounted."""
+        test_file = tmp_path / "test.py"
+        test_file.write_text("print('a')\n")
+        
+        def fail(*args, **kwargs):
+            raise OSError("read failed")
+        
+        command = CleanupCommand()
+        monkeypatch.setattr(command.analyzer, "_count_comment_lines", fail)
+        results = command.run(files=[str(test_file)])
+        detail = results["details"][0]
+        assert detail["error"] == "read failed"
+        assert detail["issues"] == [
+            {"line": 1, "content": "print('a')", "pattern": r"print[ \t]*\(", "type": "debug"}
+        ]
+        assert results["issues_found"] == results["summary"]["issues_found"] == 0
+        json.dumps(results)
+    
+    def test_get_all_files_prunes_excluded_dirs(self, tmp_path, monkeypatch):
+        """Test that the file walk skips excluded directories and files."""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("x = 1\n")
+        (tmp_path / "src" / "app.min.js").write_text("x=1")
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "index.js").write_text("x = 1\n")
+        monkeypatch.chdir(tmp_path)
+        
+        files = CleanupCommand()._get_all_files()
+        assert files == [os.path.join("src", "app.py")]
+    
+    def test_git_file_listing(self, tmp_path, monkeypatch):
+        """Test staged/modified listing, including names with spaces."""
+        monkeypatch.chdir(tmp_path)
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+        subprocess.run(["git", "init", "-q"], check=True)
+        (tmp_path / "tracked file.py").write_text("x = 1\n")
+        (tmp_path / "gone.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "."], check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "init"], check=True)
+        
+        (tmp_path / "tracked file.py").write_text("x = 2\n")
+        (tmp_path / "new file.py").write_text("y = 1\n")
+        (tmp_path / "staged.py").write_text("z = 1\n")
+        subprocess.run(["git", "add", "staged.py"], check=True)
+        subprocess.run(["git", "rm", "-q", "gone.py"], check=True)
+        
+        command = CleanupCommand()
+        assert command._get_staged_files() == ["staged.py"]
+        assert sorted(command._get_modified_files()) == ["new file.py", "tracked file.py"]
+    
+    def test_incremental_run(self, tmp_path, monkeypatch):
+        """Test that incremental runs only see files changed since the base."""
+        monkeypatch.chdir(tmp_path)
+        git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+        subprocess.run(["git", "init", "-q"], check=True)
+        (tmp_path / "old.py").write_text("print('old')\n")
+        (tmp_path / "edited.py").write_text("x = 1\n")
+        subprocess.run(["git", "add", "."], check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "base"], check=True)
+        subprocess.run(["git", "tag", "base"], check=True)
+        
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "branch.py").write_text("print('branch')\n")
+        subprocess.run(["git", "add", "."], check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "branch"], check=True)
+        (tmp_path / "edited.py").write_text("x = 2\n")
+        (tmp_path / "new.py").write_text("y = 1\n")
+        
+        config = CleanupConfig()
+        config.base_ref = "base"
+        command = CleanupCommand(config)
+        files = command._get_target_files(None, False, False, False, incremental=True)
+        assert sorted(files) == ["edited.py", "new.py", os.path.join("pkg", "branch.py")]
+        
+        config.base_ref = "no-such-ref"
+        files = command._get_target_files(None, False, False, False, incremental=True)
+        assert sorted(files) == ["edited.py", "new.py"]
+    
     def test_format_output(self):
         """Test formatting command output."""
         command = CleanupCommand()
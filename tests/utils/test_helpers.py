@@ -9,6 +9,8 @@ This module provides reusable utilities for:
 - Assertion helpers
 """
 
+from __future__ import annotations
+
 import os
 import random
 import string
@@ -18,13 +20,28 @@ import shutil
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import importlib
 import json
-import yaml
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _fake():
+    """Return the shared Faker instance, creating it on first use."""
+    from faker import Faker
+    return Faker()
 
-import git
-from faker import Faker
 
-fake = Faker()
+def __getattr__(name: str):
+    """Import git, yaml and the Faker instance lazily on first attribute access."""
+    if name == "fake":
+        value = _fake()
+    elif name in ("git", "yaml"):
+        value = importlib.import_module(name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 
 # ==================== File Generation Utilities ====================
@@ -81,7 +98,7 @@ class CodeGenerator:
         
         # Add functions
         if include_functions:
-            func_name = fake.word()
+            func_name = _fake().word()
             code_lines.extend([
                 f"def {func_name}(x, y):",
             ])
@@ -111,7 +128,7 @@ class CodeGenerator:
         
         # Add class
         if include_classes:
-            class_name = fake.word().capitalize()
+            class_name = _fake().word().capitalize()
             code_lines.extend([
                 f"class {class_name}:",
                 "    def __init__(self):",
@@ -170,7 +187,7 @@ class CodeGenerator:
         code_lines.append("")
         
         # Add function
-        func_name = fake.word()
+        func_name = _fake().word()
         code_lines.extend([
             f"function {func_name}(x, y) {{",
         ])
@@ -251,6 +268,8 @@ class GitTestHelper:
         Returns:
             Initialized git repository
         """
+        import git
+        
         repo = git.Repo.init(path)
         
         # Configure git user
@@ -325,6 +344,8 @@ class GitTestHelper:
         Returns:
             True if conflict was created successfully
         """
+        import git
+        
         main_branch = repo.heads.main or repo.heads.master
         
         # Create branch 1
@@ -460,12 +481,12 @@ class TestDataGenerator:
             
             content = f"Content for commit {i}\n"
             content += f"Timestamp: {datetime.now()}\n"
-            content += f"Random: {fake.text()}\n"
+            content += f"Random: {_fake().text()}\n"
             
             file_path.write_text(content)
             repo.index.add([file_name])
             
-            commit = repo.index.commit(f"Commit {i}: {fake.sentence()}")
+            commit = repo.index.commit(f"Commit {i}: {_fake().sentence()}")
             commits.append(commit.hexsha)
         
         return commits
@@ -475,18 +496,18 @@ class TestDataGenerator:
         """Generate realistic PR data for testing."""
         return {
             "number": random.randint(1, 1000),
-            "title": f"Feature: {fake.sentence()}",
-            "body": fake.paragraph(),
+            "title": f"Feature: {_fake().sentence()}",
+            "body": _fake().paragraph(),
             "state": random.choice(["open", "closed", "merged"]),
-            "created_at": fake.date_time().isoformat(),
-            "updated_at": fake.date_time().isoformat(),
+            "created_at": _fake().date_time().isoformat(),
+            "updated_at": _fake().date_time().isoformat(),
             "head": {
-                "ref": f"feature/{fake.word()}",
-                "sha": fake.sha1()
+                "ref": f"feature/{_fake().word()}",
+                "sha": _fake().sha1()
             },
             "base": {
                 "ref": "main",
-                "sha": fake.sha1()
+                "sha": _fake().sha1()
             },
             "files_changed": random.randint(1, 20),
             "additions": random.randint(10, 500),
@@ -639,6 +660,8 @@ commands:
             }
         }
         
+        import yaml
+        
         with open(team_config, 'w') as f:
             yaml.dump(team_data, f)
 
@@ -660,7 +683,7 @@ class MockHelpers:
             }
         elif "commits" in endpoint:
             return {
-                "sha": fake.sha1(),
+                "sha": _fake().sha1(),
                 "message": "Test commit",
                 "author": {"name": "Test User", "email": "test@example.com"}
             }